@@ -0,0 +1,121 @@
+"""
+Offline asset baking.
+
+    python -m gameEngine.asset_baker [chapters_dir]
+
+For every chapter's grid.bgImage this decodes the source once, scales it to
+(width * TILE_SIZE, height * TILE_SIZE) and writes it as uncompressed RGB
+strips, so loading at runtime is a file read instead of a JPEG decode plus a
+rescale. assets/baked/manifest.json maps "<sha1 of source>@<w>x<h>" to the strip
+files; a stale bake (source edited) simply misses and the game falls back to
+runtime scaling.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import pygame
+from .chapter_manager import load_chapters_config
+from .constants import TILE_SIZE, BAKED_ASSETS_DIR, BAKE_STRIP_HEIGHT
+
+MANIFEST_NAME = "manifest.json"
+
+_manifest_cache = {}   # baked dir -> (manifest mtime, manifest dict)
+
+def source_hash(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def bake_key(digest, size):
+    return f"{digest}@{size[0]}x{size[1]}"
+
+def load_manifest(baked_dir=BAKED_ASSETS_DIR):
+    path = os.path.join(baked_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 1, "assets": {}}
+    mtime = os.path.getmtime(path)
+    cached = _manifest_cache.get(baked_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    _manifest_cache[baked_dir] = (mtime, manifest)
+    return manifest
+
+def load_baked_surface(path, size, baked_dir=BAKED_ASSETS_DIR):
+    """
+    Return an (unconverted) surface for path baked at size, or None if there is
+    no up-to-date bake. Safe to call from the preload thread.
+    """
+    manifest = load_manifest(baked_dir)
+    if not manifest["assets"] or not os.path.exists(path):
+        return None
+    entry = manifest["assets"].get(bake_key(source_hash(path), size))
+    if not entry:
+        return None
+    try:
+        # Strips are full-width row ranges, so read them back to back into one
+        # buffer and wrap it without another copy
+        width, height = entry["size"]
+        buf = bytearray(width * height * len(entry["format"]))
+        view = memoryview(buf)
+        offset = 0
+        for strip in entry["strips"]:
+            with open(os.path.join(baked_dir, strip["file"]), 'rb') as f:
+                offset += f.readinto(view[offset:])
+        if offset != len(buf):
+            raise ValueError("baked strips are truncated")
+        return pygame.image.frombuffer(buf, (width, height), entry["format"])
+    except (OSError, ValueError) as e:
+        print(f"Ignoring broken baked asset for {path}: {e}")
+        return None
+
+def bake_image(path, size, baked_dir=BAKED_ASSETS_DIR, strip_height=BAKE_STRIP_HEIGHT):
+    """Bake one source image at size; returns (key, manifest entry)."""
+    digest = source_hash(path)
+    img = pygame.image.load(path)
+    if img.get_size() != size:
+        img = pygame.transform.scale(img, size)
+    width, height = size
+    strips = []
+    for i, y in enumerate(range(0, height, strip_height)):
+        h = min(strip_height, height - y)
+        filename = f"{digest[:16]}_{width}x{height}_{i}.rgb"
+        with open(os.path.join(baked_dir, filename), 'wb') as f:
+            f.write(pygame.image.tobytes(img.subsurface((0, y, width, h)), "RGB"))
+        strips.append({"file": filename, "y": y, "height": h})
+    entry = {"source": path, "size": [width, height], "format": "RGB", "strips": strips}
+    return bake_key(digest, size), entry
+
+def bake_chapters(chapters_dir="chapters", baked_dir=BAKED_ASSETS_DIR):
+    os.makedirs(baked_dir, exist_ok=True)
+    manifest = {"version": 1, "assets": {}}
+    for chapter_id, chapter in load_chapters_config(chapters_dir).items():
+        grid_info = chapter.get("grid", {})
+        bg_path = grid_info.get("bgImage")
+        if not bg_path or "width" not in grid_info or "height" not in grid_info:
+            continue
+        if not os.path.exists(bg_path):
+            print(f"Chapter {chapter_id}: {bg_path} not found, skipped")
+            continue
+        size = (grid_info["width"] * TILE_SIZE, grid_info["height"] * TILE_SIZE)
+        key, entry = bake_image(bg_path, size, baked_dir)
+        manifest["assets"][key] = entry
+        print(f"Chapter {chapter_id}: baked {bg_path} at {size[0]}x{size[1]} ({len(entry['strips'])} strips)")
+
+    # Drop strip files from earlier bakes that the new manifest no longer uses
+    used = {s["file"] for e in manifest["assets"].values() for s in e["strips"]}
+    for filename in os.listdir(baked_dir):
+        if filename.endswith(".rgb") and filename not in used:
+            os.remove(os.path.join(baked_dir, filename))
+
+    with open(os.path.join(baked_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+if __name__ == "__main__":
+    bake_chapters(sys.argv[1] if len(sys.argv) > 1 else "chapters")
@@ -0,0 +1,146 @@
+import os
+import threading
+from collections import OrderedDict
+import pygame
+from .constants import ASSET_CACHE_BUDGET_BYTES
+from .asset_baker import load_baked_surface
+
+_shared_assets = None
+
+def get_asset_manager():
+    """Return the process-wide AssetManager (created on first use)."""
+    global _shared_assets
+    if _shared_assets is None:
+        _shared_assets = AssetManager()
+    return _shared_assets
+
+class AssetManager:
+    """
+    Central cache of converted surfaces, keyed by (path, target size, alpha).
+
+    - acquire()/release() keep a reference count per entry; only entries nobody
+      holds are evicted once the cache goes over its byte budget (LRU order).
+    - preload() decodes and scales images on a background thread; the main
+      thread only does the cheap convert() when the asset is first acquired.
+      Acquiring something that is still being preloaded waits for that decode
+      instead of starting a second one.
+    - Preloaded surfaces count against the budget too and are dropped (oldest
+      first) once unheld cache entries alone can't bring it back under.
+    """
+    def __init__(self, budget_bytes=ASSET_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.bytes_used = 0
+        self._entries = OrderedDict()   # key -> [surface, refcount, nbytes]
+        self._decoded = OrderedDict()   # key -> decoded but not yet converted surface
+        self._pending = {}              # key -> Event set once the background decode is done
+        self._lock = threading.Lock()
+
+    def acquire(self, path, size=None, alpha=False):
+        """Return a converted surface for path (scaled to size), or None if it can't be loaded."""
+        key = (path, tuple(size) if size else None, alpha)
+        entry = self._entries.get(key)
+        if entry:
+            entry[1] += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        with self._lock:
+            surf = self._decoded.pop(key, None)
+            done = self._pending.get(key)
+        if surf is None and done is not None:
+            # Being preloaded right now: wait for it rather than decoding twice
+            done.wait()
+            with self._lock:
+                surf = self._decoded.pop(key, None)
+        if surf is None:
+            surf = self._decode(path, key[1])
+            if surf is None:
+                return None
+
+        # convert() touches the display format, so it stays on the main thread
+        surf = surf.convert_alpha() if alpha else surf.convert()
+        nbytes = surf.get_pitch() * surf.get_height()
+        self._entries[key] = [surf, 1, nbytes]
+        self.bytes_used += nbytes
+        self._evict()
+        return surf
+
+    def release(self, path, size=None, alpha=False):
+        entry = self._entries.get((path, tuple(size) if size else None, alpha))
+        if entry and entry[1] > 0:
+            entry[1] -= 1
+            self._evict()
+
+    def preload(self, requests):
+        """
+        Decode assets in the background. 'requests' is a list of (path, size, alpha).
+        Anything already cached or queued is skipped.
+        """
+        todo = []
+        with self._lock:
+            for path, size, alpha in requests:
+                key = (path, tuple(size) if size else None, alpha)
+                if key in self._entries or key in self._decoded or key in self._pending:
+                    continue
+                self._pending[key] = threading.Event()
+                todo.append(key)
+        if todo:
+            threading.Thread(target=self._preload_worker, args=(todo,), daemon=True).start()
+
+    def memory_report(self):
+        """Summary of what the cache holds, for debug displays."""
+        pinned = sum(1 for e in self._entries.values() if e[1] > 0)
+        with self._lock:
+            decoded_bytes = sum(s.get_pitch() * s.get_height() for s in self._decoded.values())
+        return {
+            "entries": len(self._entries),
+            "pinned": pinned,
+            "bytes": self.bytes_used,
+            "preloadedBytes": decoded_bytes,
+            "budgetBytes": self.budget_bytes,
+        }
+
+    def _preload_worker(self, keys):
+        for key in keys:
+            surf = self._decode(key[0], key[1])
+            with self._lock:
+                if surf is not None and key not in self._entries:
+                    self._decoded[key] = surf
+                    self._trim_preloads()
+                self._pending.pop(key).set()
+
+    def _decode(self, path, size):
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            # Prefer an offline bake at exactly this size (see asset_baker)
+            if size:
+                baked = load_baked_surface(path, size)
+                if baked is not None:
+                    return baked
+            surf = pygame.image.load(path)
+            if size and surf.get_size() != size:
+                surf = pygame.transform.scale(surf, size)
+            return surf
+        except Exception as e:
+            print(f"Failed to load asset {path}: {e}")
+            return None
+
+    def _evict(self):
+        if self.bytes_used > self.budget_bytes:
+            for key in list(self._entries):
+                surf, refcount, nbytes = self._entries[key]
+                if refcount == 0:
+                    del self._entries[key]
+                    self.bytes_used -= nbytes
+                    if self.bytes_used <= self.budget_bytes:
+                        break
+        with self._lock:
+            self._trim_preloads()
+
+    def _trim_preloads(self):
+        """Drop the oldest preloads nobody has asked for yet while over budget (caller holds _lock)."""
+        decoded_bytes = sum(s.get_pitch() * s.get_height() for s in self._decoded.values())
+        while self._decoded and self.bytes_used + decoded_bytes > self.budget_bytes:
+            _, surf = self._decoded.popitem(last=False)
+            decoded_bytes -= surf.get_pitch() * surf.get_height()
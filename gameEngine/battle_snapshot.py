@@ -0,0 +1,77 @@
+"""
+Mid-battle saves stored as a delta against the chapter's grid template.
+
+Instead of dumping every unit, we only keep what differs from the units the
+chapter starts with (playerUnits/enemyUnits plus the defaults GameManager
+fills in): changed fields per unit, the units that were removed, the turn
+counter and the phase. A save therefore grows with how much happened in the
+battle, not with the size of the map or roster.
+
+Example:
+    {
+      "chapterId": 1,
+      "turn": 3,
+      "phase": "PLAYER",
+      "units": {"player:hero1": {"x": 6, "y": 3, "hasMoved": "DONE"}},
+      "removed": ["enemy:enemy4"]
+    }
+
+The same delta doubles as the snapshot sent between networked players, and
+its checksum is what they compare to notice they have drifted apart.
+"""
+
+import json
+import zlib
+
+def unit_key(unit):
+    return f"{unit['side']}:{unit['unitId']}"
+
+def diff_units(template_units, live_units):
+    """Return (changed fields per unit key, removed unit keys)."""
+    live_by_key = {unit_key(u): u for u in live_units}
+    changed = {}
+    removed = []
+    for base in template_units:
+        key = unit_key(base)
+        live = live_by_key.get(key)
+        if live is None:
+            removed.append(key)
+            continue
+        fields = {k: v for k, v in live.items() if base.get(k) != v}
+        if fields:
+            changed[key] = fields
+    return changed, removed
+
+def capture_battle_delta(chapter_id, template_units, live_units, battle):
+    """Build the save dict for the live battle (see module docstring)."""
+    changed, removed = diff_units(template_units, live_units)
+    return {
+        "chapterId": chapter_id,
+        "turn": battle.turn,
+        "phase": battle.phase.value,
+        "units": changed,
+        "removed": removed,
+    }
+
+def apply_battle_delta(template_units, delta):
+    """
+    Patch freshly built template units with a saved delta, in place.
+    Returns the surviving units in template order.
+    """
+    removed = set(delta.get("removed", []))
+    changed = delta.get("units", {})
+    units = []
+    for unit in template_units:
+        key = unit_key(unit)
+        if key in removed:
+            continue
+        fields = changed.get(key)
+        if fields:
+            unit.update(fields)
+        units.append(unit)
+    return units
+
+def delta_checksum(delta):
+    """CRC32 of a battle delta (keys sorted), equal on every machine for equal battles."""
+    data = json.dumps(delta, sort_keys=True, separators=(",", ":"))
+    return zlib.crc32(data.encode("utf-8"))
@@ -0,0 +1,139 @@
+from enum import Enum
+
+class ActionState(str, Enum):
+    """Per-unit action state for the current turn (stored in unit["hasMoved"])."""
+    NOT_YET = "NOT_YET"
+    SELECTED = "SELECTED"
+    MOVED_NEED_TO_CONFIRM = "MOVED_NEED_TO_CONFIRM"              # pop-up menu open
+    ATTACK_NEED_TO_CONFIRM = "ATTACK_NEED_TO_CONFIRM"            # choosing an attack target
+    CAST_NEED_TO_CONFIRM = "CAST_NEED_TO_CONFIRM"                # cast sub menu open
+    CAST_NEED_TO_CHOOSE_TARGET = "CAST_NEED_TO_CHOOSE_TARGET"
+    DONE = "DONE"
+
+class TurnPhase(str, Enum):
+    PLAYER = "PLAYER"
+    ENEMY = "ENEMY"
+    VICTORY = "VICTORY"
+    DEFEAT = "DEFEAT"
+
+# Allowed action state changes. Anything can be cancelled back to NOT_YET
+# (right-click undo) and DONE only goes back to NOT_YET when a new turn starts.
+ACTION_TRANSITIONS = {
+    ActionState.NOT_YET: {ActionState.SELECTED, ActionState.DONE},
+    ActionState.SELECTED: {ActionState.MOVED_NEED_TO_CONFIRM, ActionState.NOT_YET},
+    ActionState.MOVED_NEED_TO_CONFIRM: {ActionState.ATTACK_NEED_TO_CONFIRM, ActionState.CAST_NEED_TO_CONFIRM,
+                                        ActionState.DONE, ActionState.NOT_YET},
+    ActionState.ATTACK_NEED_TO_CONFIRM: {ActionState.DONE, ActionState.NOT_YET},
+    ActionState.CAST_NEED_TO_CONFIRM: {ActionState.CAST_NEED_TO_CHOOSE_TARGET,
+                                       ActionState.MOVED_NEED_TO_CONFIRM, ActionState.NOT_YET},
+    ActionState.CAST_NEED_TO_CHOOSE_TARGET: {ActionState.DONE, ActionState.NOT_YET},
+    ActionState.DONE: {ActionState.NOT_YET},
+}
+
+PHASE_TRANSITIONS = {
+    TurnPhase.PLAYER: {TurnPhase.ENEMY, TurnPhase.VICTORY, TurnPhase.DEFEAT},
+    TurnPhase.ENEMY: {TurnPhase.PLAYER, TurnPhase.VICTORY, TurnPhase.DEFEAT},
+    TurnPhase.VICTORY: set(),
+    TurnPhase.DEFEAT: set(),
+}
+
+SIDE_PHASE = {"player": TurnPhase.PLAYER, "enemy": TurnPhase.ENEMY}
+
+class BattleLedger:
+    """
+    Running per-side counters for one grid battle, updated as units act, move
+    and die, so victory/defeat/turn-limit/all-done checks never scan the unit
+    list. All unit action state changes go through set_state().
+    """
+    def __init__(self, max_turns=10):
+        self.max_turns = max_turns
+        self.turn = 1
+        self.phase = TurnPhase.PLAYER
+        self.out_of_turns = False
+        self.alive = {"player": 0, "enemy": 0}
+        self.done = {"player": 0, "enemy": 0}
+        # Units not in NOT_YET, per side: the only ones a new turn has to reset
+        self._acted = {"player": {}, "enemy": {}}
+
+    def add_unit(self, unit):
+        side = unit["side"]
+        unit["hasMoved"] = ActionState(unit.get("hasMoved", ActionState.NOT_YET))
+        self.alive[side] += 1
+        if unit["hasMoved"] != ActionState.NOT_YET:
+            self._acted[side][id(unit)] = unit
+        if unit["hasMoved"] == ActionState.DONE:
+            self.done[side] += 1
+
+    def remove_unit(self, unit):
+        side = unit["side"]
+        self.alive[side] -= 1
+        self._acted[side].pop(id(unit), None)
+        if unit["hasMoved"] == ActionState.DONE:
+            self.done[side] -= 1
+
+    def set_state(self, unit, new_state):
+        old_state = unit["hasMoved"]
+        if new_state == old_state:
+            return
+        if new_state not in ACTION_TRANSITIONS[old_state]:
+            raise ValueError(f"Invalid action state change for {unit['unitId']}: {old_state.value} -> {new_state.value}")
+        side = unit["side"]
+        unit["hasMoved"] = new_state
+        if old_state == ActionState.DONE:
+            self.done[side] -= 1
+        elif new_state == ActionState.DONE:
+            self.done[side] += 1
+        if new_state == ActionState.NOT_YET:
+            self._acted[side].pop(id(unit), None)
+        else:
+            self._acted[side][id(unit)] = unit
+
+    def set_phase(self, new_phase):
+        if new_phase == self.phase:
+            return
+        if new_phase not in PHASE_TRANSITIONS[self.phase]:
+            raise ValueError(f"Invalid turn phase change: {self.phase.value} -> {new_phase.value}")
+        self.phase = new_phase
+
+    def end_phase(self):
+        """
+        Hand over to the other side. Ending the enemy phase starts the next turn,
+        or ends the battle in defeat when the turn limit is used up.
+        Only units that acted are reset, not the whole roster.
+        """
+        if self.phase == TurnPhase.PLAYER:
+            self.set_phase(TurnPhase.ENEMY)
+            self._reset_side("enemy")
+        elif self.phase == TurnPhase.ENEMY:
+            if self.turn >= self.max_turns:
+                self.out_of_turns = True
+                self.set_phase(TurnPhase.DEFEAT)
+                return
+            self.turn += 1
+            self.set_phase(TurnPhase.PLAYER)
+            self._reset_side("player")
+
+    def _reset_side(self, side):
+        acted = self._acted[side]
+        for unit in acted.values():
+            unit["hasMoved"] = ActionState.NOT_YET
+        acted.clear()
+        self.done[side] = 0
+
+    # --- O(1) queries ---
+
+    def is_side_turn(self, side):
+        return self.phase == SIDE_PHASE[side]
+
+    def all_done(self, side):
+        return self.done[side] == self.alive[side]
+
+    def is_victory(self):
+        if self.phase == TurnPhase.DEFEAT:
+            return False
+        return self.phase == TurnPhase.VICTORY or self.alive["enemy"] == 0
+
+    def is_defeat(self):
+        if self.phase == TurnPhase.VICTORY:
+            return False
+        return self.phase == TurnPhase.DEFEAT or self.alive["player"] == 0
@@ -0,0 +1,178 @@
+import math
+import pygame
+from .constants import (CAMERA_SCROLL_SPEED, CAMERA_EDGE_PAN_MARGIN, CAMERA_FRICTION,
+                        CAMERA_MIN_SPEED, GRID_FALLBACK_COLOR)
+
+class Camera:
+    """
+    Pixel-precise grid camera with keyboard scrolling, edge panning,
+    middle-button dragging and inertia.
+
+    Position is kept as floats for smooth sub-tile movement; drawing code
+    uses the integer ix/iy. The camera is always clamped so it never goes
+    negative, even when the map is smaller than the window.
+    """
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.vx = 0.0   # pixels per second
+        self.vy = 0.0
+        self.max_x = 0
+        self.max_y = 0
+        self.view_w = 0
+        self.view_h = 0
+        self._drag_last = None
+        self._drag_moved = (0.0, 0.0)     # drag distance since the last update()
+        self._drag_velocity = (0.0, 0.0)
+
+    @property
+    def ix(self):
+        return int(round(self.x))
+
+    @property
+    def iy(self):
+        return int(round(self.y))
+
+    def reset(self, world_w, world_h, view_w, view_h):
+        self.view_w, self.view_h = view_w, view_h
+        self.max_x = max(0, world_w - view_w)
+        self.max_y = max(0, world_h - view_h)
+        self.x = self.y = 0.0
+        self.vx = self.vy = 0.0
+        self._drag_last = None
+
+    def center_on(self, px, py):
+        """Center the view on world pixel (px, py)."""
+        self.vx = self.vy = 0.0
+        self._move_to(px - self.view_w / 2, py - self.view_h / 2)
+
+    def start_drag(self, pos):
+        self._drag_last = pos
+        self._drag_moved = (0.0, 0.0)
+        self._drag_velocity = (0.0, 0.0)
+        self.vx = self.vy = 0.0
+
+    def drag_to(self, pos):
+        if self._drag_last is None:
+            return
+        dx = pos[0] - self._drag_last[0]
+        dy = pos[1] - self._drag_last[1]
+        self._drag_last = pos
+        self._drag_moved = (self._drag_moved[0] + dx, self._drag_moved[1] + dy)
+        self._move_to(self.x - dx, self.y - dy)
+
+    def end_drag(self):
+        if self._drag_last is None:
+            return
+        self._drag_last = None
+        # Let the map keep sliding after a fling
+        self.vx, self.vy = self._drag_velocity
+
+    @property
+    def dragging(self):
+        return self._drag_last is not None
+
+    def update(self, dt, keys, mouse_pos, top):
+        """
+        Advance the camera by dt seconds.
+        keys: pygame.key.get_pressed(); mouse_pos: cursor position or None when
+        the window has no mouse focus; top: y where the grid starts on screen.
+        """
+        if self.dragging:
+            # Remember how fast the map was being dragged for the fling on release
+            if dt > 0:
+                self._drag_velocity = (-self._drag_moved[0] / dt, -self._drag_moved[1] / dt)
+            self._drag_moved = (0.0, 0.0)
+            return
+
+        dir_x = (1 if keys[pygame.K_RIGHT] else 0) - (1 if keys[pygame.K_LEFT] else 0)
+        dir_y = (1 if keys[pygame.K_DOWN] else 0) - (1 if keys[pygame.K_UP] else 0)
+
+        if mouse_pos is not None and mouse_pos[1] > top:
+            mx, my = mouse_pos
+            if mx < CAMERA_EDGE_PAN_MARGIN:
+                dir_x = -1
+            elif mx >= self.view_w - CAMERA_EDGE_PAN_MARGIN:
+                dir_x = 1
+            if my - top >= self.view_h - CAMERA_EDGE_PAN_MARGIN:
+                dir_y = 1
+            elif my - top < CAMERA_EDGE_PAN_MARGIN:
+                dir_y = -1
+
+        if dir_x or dir_y:
+            self.vx = dir_x * CAMERA_SCROLL_SPEED
+            self.vy = dir_y * CAMERA_SCROLL_SPEED
+        else:
+            decay = math.exp(-CAMERA_FRICTION * dt)
+            self.vx *= decay
+            self.vy *= decay
+            if abs(self.vx) < CAMERA_MIN_SPEED:
+                self.vx = 0.0
+            if abs(self.vy) < CAMERA_MIN_SPEED:
+                self.vy = 0.0
+
+        if self.vx or self.vy:
+            self._move_to(self.x + self.vx * dt, self.y + self.vy * dt)
+
+    def _move_to(self, x, y):
+        clamped_x = min(max(0.0, x), self.max_x)
+        clamped_y = min(max(0.0, y), self.max_y)
+        # Stop sliding into a wall
+        if clamped_x != x:
+            self.vx = 0.0
+        if clamped_y != y:
+            self.vy = 0.0
+        self.x, self.y = clamped_x, clamped_y
+
+class ViewportBuffer:
+    """
+    Off-screen copy of the visible background. When the camera moves, the
+    buffer is scrolled by the delta and only the newly exposed strips are
+    redrawn from the background, so scrolling costs the exposed area rather
+    than the whole view.
+    """
+    def __init__(self):
+        self.surface = None
+        self._background = None
+        self._last = None   # camera position the buffer currently shows
+
+    def invalidate(self):
+        self._last = None
+
+    def render(self, background, camera_x, camera_y, view_w, view_h):
+        if self.surface is None or self.surface.get_size() != (view_w, view_h):
+            self.surface = pygame.Surface((view_w, view_h)).convert()
+            self._last = None
+        if background is not self._background:
+            self._background = background
+            self._last = None
+
+        if self._last is None:
+            self._draw_area(0, 0, view_w, view_h, camera_x, camera_y)
+        else:
+            dx = camera_x - self._last[0]
+            dy = camera_y - self._last[1]
+            if abs(dx) >= view_w or abs(dy) >= view_h:
+                self._draw_area(0, 0, view_w, view_h, camera_x, camera_y)
+            elif dx or dy:
+                self.surface.scroll(-dx, -dy)
+                # Exposed vertical strip (left or right edge)
+                if dx > 0:
+                    self._draw_area(view_w - dx, 0, dx, view_h, camera_x, camera_y)
+                elif dx < 0:
+                    self._draw_area(0, 0, -dx, view_h, camera_x, camera_y)
+                # Exposed horizontal strip (top or bottom edge)
+                if dy > 0:
+                    self._draw_area(0, view_h - dy, view_w, dy, camera_x, camera_y)
+                elif dy < 0:
+                    self._draw_area(0, 0, view_w, -dy, camera_x, camera_y)
+        self._last = (camera_x, camera_y)
+        return self.surface
+
+    def _draw_area(self, x, y, w, h, camera_x, camera_y):
+        """Redraw the buffer rectangle (x, y, w, h) from the background."""
+        rect = pygame.Rect(x, y, w, h)
+        self.surface.fill(GRID_FALLBACK_COLOR, rect)
+        if self._background:
+            self.surface.blit(self._background, rect.topleft,
+                              pygame.Rect(camera_x + x, camera_y + y, w, h))
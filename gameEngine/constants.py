@@ -16,6 +16,32 @@ MENU_OPTION_SPACING = 40
 
 # Grid Constants
 TILE_SIZE = 32
+GRID_FALLBACK_COLOR = (34, 139, 34)   # shown where there is no background image
+DEFAULT_MOVE_RANGE = 5
+
+# Group orders (shift + drag to box-select, then click a destination)
+GROUP_HIGHLIGHT_COLOR = (0, 255, 0)
+BOX_SELECT_COLOR = (255, 255, 255)
+
+# Camera
+CAMERA_SCROLL_SPEED = 480      # pixels per second while a key/edge pan is held
+CAMERA_EDGE_PAN_MARGIN = 8     # pixels from the window edge that start edge panning
+CAMERA_FRICTION = 10.0         # how quickly a fling slows down (1/s)
+CAMERA_MIN_SPEED = 5.0         # below this the camera stops
+
+# Fog of war
+DEFAULT_VISION_RANGE = 6
+FOG_COLOR = (0, 0, 0, 160)
+
+# Unit sprites
+UNIT_ATLAS_IMAGE = "assets/units_atlas.png"
+UNIT_ATLAS_TABLE = "assets/units_atlas.json"
+UNIT_FRAME_MS = 150
+
+# Asset cache
+ASSET_CACHE_BUDGET_BYTES = 64 * 1024 * 1024
+BAKED_ASSETS_DIR = "assets/baked"
+BAKE_STRIP_HEIGHT = 256
 
 # Popup Menu Constants
 POPUP_MENU_WIDTH = 80
@@ -26,6 +52,30 @@ POPUP_TEXT_PADDING_Y = 5
 POPUP_CAST_Y_OFFSET = 30
 POPUP_STAY_Y_OFFSET = 50
 
+# Minimap
+MINIMAP_MAX_SIZE = 120        # longest side in pixels (at least 1 pixel per tile)
+MINIMAP_MARGIN = 8
+MINIMAP_BORDER_COLOR = (200, 200, 200)
+MINIMAP_CAMERA_COLOR = (255, 255, 0)
+MINIMAP_PLAYER_COLOR = (0, 255, 0)
+MINIMAP_ENEMY_COLOR = (255, 0, 0)
+
+# Hover tooltip
+TOOLTIP_FONT_SIZE = 22
+TOOLTIP_PADDING = 6
+TOOLTIP_BG_COLOR = (20, 20, 20, 200)
+
+# LAN play
+NET_DEFAULT_PORT = 8765
+NET_CHECKSUM_INTERVAL = 4     # commands between state checksums (end of turn always checks)
+
+# Telemetry (main.py --telemetry)
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_CAPACITY = 4096              # events in the ring buffer, power of two
+TELEMETRY_FLUSH_INTERVAL = 1.0         # seconds between batched writes
+TELEMETRY_MAX_FILE_BYTES = 1024 * 1024
+TELEMETRY_SPIKE_MS = 50                # frames slower than this are recorded
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -33,4 +83,4 @@ YELLOW = (255, 255, 0)
 LIGHT_GRAY = (200, 200, 200)
 DARK_GRAY = (50, 50, 50)
 MEDIUM_GRAY = (100, 100, 100)
-POPUP_BG_COLOR = (60, 60, 60)
\ No newline at end of file
+POPUP_BG_COLOR = (60, 60, 60)
@@ -0,0 +1,119 @@
+import numpy as np
+
+UNREACHABLE = -1
+MAX_CACHED_FIELDS = 32
+
+def compute_distance_field(passable, goals):
+    """
+    Multi-source BFS over a 4-connected grid, done one wavefront at a time
+    with whole-array NumPy shifts instead of a Python queue.
+
+    passable: bool array (h, w), goals: bool array (h, w).
+    Returns an int32 array of step distances to the nearest goal,
+    UNREACHABLE where no goal can be reached.
+    """
+    dist = np.full(passable.shape, UNREACHABLE, dtype=np.int32)
+    reached = goals.copy()
+    frontier = goals.copy()
+    step = 0
+    while frontier.any():
+        dist[frontier] = step
+        grown = np.zeros_like(frontier)
+        grown[1:, :] |= frontier[:-1, :]
+        grown[:-1, :] |= frontier[1:, :]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        frontier = grown & passable & ~reached
+        reached |= frontier
+        step += 1
+    return dist
+
+class DistanceFieldService:
+    """
+    Shared goal-directed distance fields for the current grid chapter.
+
+    A field like "distance to the nearest player unit" is built once and then
+    answered for every enemy that asks during a turn. Fields are only rebuilt
+    when something they depend on changes: the terrain, or the positions of
+    the units they lead towards. Units of other sides are not obstacles here,
+    so an enemy moving does not throw away the field towards the players.
+    """
+    def __init__(self, grid_info):
+        self.width = grid_info["width"]
+        self.height = grid_info["height"]
+
+        # Optional terrain from the chapter: grid.blockedTiles = [[x, y], ...]
+        self.passable = np.ones((self.height, self.width), dtype=bool)
+        for x, y in grid_info.get("blockedTiles", []):
+            self.passable[y, x] = False
+
+        self.terrain_version = 0
+        self.side_versions = {"player": 0, "enemy": 0}
+        self._side_positions = {"player": {}, "enemy": {}}  # side -> id(unit) -> (x, y)
+        self._fields = {}        # key -> (dependency versions, field)
+        self._objectives = {}    # name -> list of (x, y)
+        for name, tiles in grid_info.get("objectiveTiles", {}).items():
+            self.set_objective(name, tiles)
+
+    # --- keeping the inputs up to date ---
+
+    def add_unit(self, unit):
+        self._side_positions[unit["side"]][id(unit)] = (unit["x"], unit["y"])
+        self.side_versions[unit["side"]] += 1
+
+    def update_unit(self, unit):
+        positions = self._side_positions[unit["side"]]
+        pos = (unit["x"], unit["y"])
+        if id(unit) in positions and positions[id(unit)] != pos:
+            positions[id(unit)] = pos
+            self.side_versions[unit["side"]] += 1
+
+    def remove_unit(self, unit):
+        if self._side_positions[unit["side"]].pop(id(unit), None) is not None:
+            self.side_versions[unit["side"]] += 1
+
+    def set_blocked(self, x, y, blocked=True):
+        if self.passable[y, x] == (not blocked):
+            return
+        self.passable[y, x] = not blocked
+        self.terrain_version += 1
+
+    def set_objective(self, name, tiles):
+        """Register (or replace) a named set of objective tiles, e.g. a castle gate."""
+        self._objectives[name] = [tuple(t) for t in tiles]
+        self._fields.pop(("objective", name), None)
+
+    # --- queries ---
+
+    def field_to_side(self, side):
+        """Distance from every tile to the nearest living unit of 'side'."""
+        versions = (self.terrain_version, self.side_versions[side])
+        return self._get_field(("side", side), versions, self._side_positions[side].values())
+
+    def field_to_objective(self, name):
+        versions = (self.terrain_version,)
+        return self._get_field(("objective", name), versions, self._objectives.get(name, []))
+
+    def field_to_tile(self, x, y):
+        """Single-goal field, cached by tile so a group heading to one spot shares it."""
+        return self._get_field(("tile", x, y), (self.terrain_version,), [(x, y)])
+
+    def _get_field(self, key, versions, goal_tiles):
+        cached = self._fields.get(key)
+        if cached and cached[0] == versions:
+            return cached[1]
+        goals = np.zeros_like(self.passable)
+        for x, y in goal_tiles:
+            goals[y, x] = True
+        field = compute_distance_field(self.passable, goals)
+        self._fields.pop(key, None)
+        self._fields[key] = (versions, field)
+        # Keep the cache bounded; oldest entries go first (dicts keep insertion order)
+        while len(self._fields) > MAX_CACHED_FIELDS:
+            del self._fields[next(iter(self._fields))]
+        return field
+
+    def distance(self, field, x, y):
+        """Steps from (x, y) to the field's goal, or None if unreachable."""
+        d = int(field[y, x])
+        return None if d == UNREACHABLE else d
@@ -1,8 +1,16 @@
 import pygame
-import os
 from collections import deque
 from .chapter_manager import get_chapter_by_id
-from .constants import STATUS_BAR_HEIGHT
+from .constants import STATUS_BAR_HEIGHT, DEFAULT_VISION_RANGE, DEFAULT_MOVE_RANGE
+from .visibility import VisibilityEngine
+from .distance_fields import DistanceFieldService
+from .sprites import UnitAnimator, get_unit_atlas
+from .asset_manager import get_asset_manager
+from .minimap import Minimap
+from .battle_state import ActionState, TurnPhase, BattleLedger, SIDE_PHASE
+from .battle_snapshot import unit_key, capture_battle_delta, apply_battle_delta
+from .group_orders import plan_group_move
+from .telemetry import get_telemetry
 
 class GameManager:
     def __init__(self, chapters_data, game_state):
@@ -15,15 +23,27 @@ class GameManager:
         # GRID MODE attributes
         self.current_grid_data = None      # Stores {width, height, bgImage, ...}
         self.grid_background = None        # Pygame.Surface or None
+        self.grid_background_key = None    # (path, size) held in the asset cache
+        self.assets = get_asset_manager()
+        self.telemetry = get_telemetry()
         self.grid_units = []              # List of dicts for all units (player + enemy)
         self.selected_unit = None         # The currently selected player unit
+        self.group = []                   # Box-selected units waiting for a group order
         self.reachable_tiles = []         # List of (x,y) tiles the selected unit can move to
         self.tile_size = 32               # Each grid cell is 32x32 pixels
+        self.visibility = None            # VisibilityEngine when the chapter has fog of war
+        self.distance_fields = None       # DistanceFieldService shared by AI/UI distance queries
+        self.unit_animator = None         # UnitAnimator, created on first grid entry (needs a display)
+        self.grid_revision = 0            # Bumped whenever units move, die or take damage
+        self.minimap = None               # Minimap of the current grid chapter
 
-        # Turn Tracking
-        self.isPlayerTurn = True          # True = player turn, False = enemy turn
-        self.grid_currentTurn = 1         # Increments each time enemy turn ends
-        self.grid_maxTurns = 10           # Fetched from chapter config
+        # Turn Tracking: phase, turn counter and per-side counts live in the ledger
+        self.battle = BattleLedger()
+
+        # Networked play (see netplay.py): sides this machine may command (None = both,
+        # hot-seat) and a callback receiving every completed local command
+        self.local_sides = None
+        self.on_command = None
 
         # pop-up menu
         self.context_menu = {      # A simple dict to track the tiny popup menu
@@ -36,13 +56,18 @@ class GameManager:
         self.attackable_tiles = []       # The coordinates of adjacent enemies for the selected unit**
         self.attackable_tiles_drawing = []
 
-        self.ACTION_STATE_NOT_YET = "NOT_YET"
-        self.ACTION_STATE_SELECTED = "SELECTED"
-        self.ACTION_STATE_MOVED_NEED_TO_CONFRIM = "MOVED_NEED_TO_CONFRIM" # pop-up menu open
-        self.ACTION_STATE_ATTACK_NEED_TO_CONFRIM = "ATTACK_NEED_TO_CONFRIM"
-        self.ACTION_STATE_CAST_NEED_TO_CONFIRM = "CAST_NEED_TO_CONFIRM" # cast sub menu open
-        self.ACTION_STATE_CAST_NEED_TO_CHOOSE_TARGET = "CAST_NEED_TO_CHOOSE_TARGET" 
-        self.ACTION_STATE_DONE = "DONE"
+    @property
+    def isPlayerTurn(self):
+        """True = player turn, False = enemy turn (or the battle is over)."""
+        return self.battle.phase == TurnPhase.PLAYER
+
+    @property
+    def grid_currentTurn(self):
+        return self.battle.turn
+
+    @property
+    def grid_maxTurns(self):
+        return self.battle.max_turns
 
     def start_chapter(self):
         """Load the current chapter and trigger any 'onStart' events."""
@@ -55,6 +80,25 @@ class GameManager:
         self.trigger_events(chapter, "onStart")
         self.message = f"Chapter {chapter_id} started: {chapter.get('title')}"
 
+        # Decode this chapter's (and the next one's) grid art while the player is in the overworld
+        self.preload_chapter_assets(chapter)
+        next_chapter = get_chapter_by_id(self.chapters_data, chapter.get("defaultNextChapterId"))
+        if next_chapter:
+            self.preload_chapter_assets(next_chapter)
+
+    def grid_background_request(self, chapter):
+        """(path, size) of the chapter's grid background at its final tile resolution."""
+        grid_info = chapter.get("grid", {})
+        bg_path = grid_info.get("bgImage")
+        if not bg_path or "width" not in grid_info or "height" not in grid_info:
+            return None
+        return (bg_path, (grid_info["width"] * self.tile_size, grid_info["height"] * self.tile_size))
+
+    def preload_chapter_assets(self, chapter):
+        request = self.grid_background_request(chapter)
+        if request:
+            self.assets.preload([(request[0], request[1], False)])
+
     def start_grid_mode(self):
         """
         Prepare the data for the grid-based campaign:
@@ -71,21 +115,90 @@ class GameManager:
         grid_info = chapter.get("grid", {})
         self.current_grid_data = grid_info
 
-        # Attempt to load bgImage
-        bg_path = grid_info.get("bgImage")
+        # Background comes from the shared asset cache, already scaled to
+        # (width * tileSize, height * tileSize); re-entering the chapter is a cache hit.
+        if self.grid_background_key:
+            self.assets.release(*self.grid_background_key)
         self.grid_background = None
-        if bg_path and os.path.exists(bg_path):
-            try:
-                img = pygame.image.load(bg_path).convert()
-                # Scale to (width * tileSize, height * tileSize)
-                desired_w = grid_info["width"] * self.tile_size
-                desired_h = grid_info["height"] * self.tile_size
-                self.grid_background = pygame.transform.scale(img, (desired_w, desired_h))
-            except Exception as e:
-                print(f"Failed to load background image: {e}")
+        self.grid_background_key = self.grid_background_request(chapter)
+        if self.grid_background_key:
+            self.grid_background = self.assets.acquire(*self.grid_background_key)
+
+        next_chapter = get_chapter_by_id(self.chapters_data, chapter.get("defaultNextChapterId"))
+        if next_chapter:
+            self.preload_chapter_assets(next_chapter)
+
+        # Start from the chapter's roster; a suspended battle is a delta on top of it
+        self.grid_units = self.build_template_units(grid_info)
+        saved = self.game_state.currentChapterState
+        resumed = bool(saved) and saved.get("chapterId") == chapter_id
+        if resumed:
+            self.grid_units = apply_battle_delta(self.grid_units, saved)
+
+        # Turn 1, player phase (or the saved turn/phase), counters rebuilt from the roster
+        self.battle = BattleLedger(grid_info.get("maxTurns", 10))
+        if resumed:
+            self.battle.turn = saved.get("turn", 1)
+            self.battle.phase = TurnPhase(saved.get("phase", TurnPhase.PLAYER.value))
+        for u in self.grid_units:
+            self.battle.add_unit(u)
+
+        if self.unit_animator is None:
+            self.unit_animator = UnitAnimator(get_unit_atlas(self.tile_size))
+
+        self.distance_fields = DistanceFieldService(grid_info)
+        for u in self.grid_units:
+            self.distance_fields.add_unit(u)
+
+        self.build_side_views()
+
+        self.selected_unit = None
+        self.selected_unit_before_action = None
+        self.reachable_tiles = []
+        self.group = []
+        self.grid_revision += 1
+        if resumed:
+            self.message = f"Resumed battle in Chapter {chapter_id} (Turn {self.grid_currentTurn})"
+        else:
+            self.message = f"Entered Grid Mode for Chapter {chapter_id}"
+
+    def viewer_side(self):
+        """The side whose view is drawn: the one this machine commands, else the player."""
+        if self.local_sides and len(self.local_sides) == 1:
+            return next(iter(self.local_sides))
+        return "player"
+
+    def build_side_views(self):
+        """(Re)build the fog of war and minimap for the current grid, seen by viewer_side()."""
+        grid_info = self.current_grid_data
+        viewer = self.viewer_side()
+
+        # Fog of war is opt-in per chapter via grid.fogOfWar
+        self.visibility = None
+        if grid_info.get("fogOfWar", False):
+            self.visibility = VisibilityEngine(grid_info["width"], grid_info["height"], self.tile_size, viewer)
+            for u in self.grid_units:
+                self.visibility.add_unit(u, u.get("vision", DEFAULT_VISION_RANGE))
 
+        # The opponent's markers would give away positions under fog of war
+        opponent = "enemy" if viewer == "player" else "player"
+        self.minimap = Minimap(grid_info["width"], grid_info["height"], self.grid_background,
+                               hidden_side=opponent if self.visibility else None)
+        for u in self.grid_units:
+            self.minimap.add_unit(u)
+        self.grid_revision += 1
+
+    def set_local_sides(self, sides):
+        """Change which sides this machine commands; the fog and minimap follow the new viewer."""
+        old_viewer = self.viewer_side()
+        self.local_sides = sides
+        if self.current_grid_data and self.minimap and self.viewer_side() != old_viewer:
+            self.build_side_views()
+
+    def build_template_units(self, grid_info):
+        """Fresh unit dicts for the chapter's starting roster, with defaults filled in."""
         # Combine playerUnits & enemyUnits into a single list
-        self.grid_units = []
+        units = []
         player_units = grid_info.get("playerUnits", [])
         for pu in player_units:
             unit_copy = dict(pu)
@@ -96,8 +209,8 @@ class GameManager:
             unit_copy.setdefault("attack", 5)
             unit_copy.setdefault("defense", 2)
             # Track if unit has moved this turn
-            unit_copy["hasMoved"] = self.ACTION_STATE_NOT_YET
-            self.grid_units.append(unit_copy)
+            unit_copy["hasMoved"] = ActionState.NOT_YET
+            units.append(unit_copy)
 
         enemy_units = grid_info.get("enemyUnits", [])
         for eu in enemy_units:
@@ -105,39 +218,77 @@ class GameManager:
             unit_copy["side"] = "enemy"
             unit_copy.setdefault("HP", 15)
             unit_copy.setdefault("attack", 3)
-            unit_copy["hasMoved"] = self.ACTION_STATE_NOT_YET
-            self.grid_units.append(unit_copy)
+            unit_copy["hasMoved"] = ActionState.NOT_YET
+            units.append(unit_copy)
+        return units
+
+    def suspend_battle(self):
+        """
+        Keep the live battle in game_state.currentChapterState (as a delta against
+        the chapter template) so leaving grid mode or saving doesn't lose it.
+        """
+        if not self.current_grid_data or self.battle.phase not in (TurnPhase.PLAYER, TurnPhase.ENEMY):
+            return
+        if self.selected_unit:
+            self.cancel_selection()
+        self.game_state.currentChapterState = self.capture_battle()
+
+    def capture_battle(self):
+        """The live battle as a delta against the chapter template (see battle_snapshot.py)."""
+        return capture_battle_delta(
+            self.game_state.currentChapterId,
+            self.build_template_units(self.current_grid_data),
+            self.grid_units,
+            self.battle,
+        )
+
+    def restore_battle(self, delta):
+        """Replace the live battle with a captured one (e.g. a snapshot from the host)."""
+        self.game_state.currentChapterId = delta["chapterId"]
+        self.game_state.currentChapterState = delta
+        self.start_grid_mode()
+
+    def is_local_side(self, side):
+        return self.local_sides is None or side in self.local_sides
+
+    def is_local_turn(self):
+        return any(self.battle.phase == phase and self.is_local_side(side)
+                   for side, phase in SIDE_PHASE.items())
+
+    def emit_command(self, command):
+        if self.on_command:
+            self.on_command(command)
 
-        self.selected_unit = None
-        self.selected_unit_before_action = None
-        self.reachable_tiles = []
-        self.message = f"Entered Grid Mode for Chapter {chapter_id}"
-    
     def end_turn(self):
         """
         Switch between Player Turn and Enemy Turn.
         If we are on Enemy Turn -> end enemy turn, move to next player turn, 
-        increment turn counter.
+        increment turn counter (or lose if the chapter's maxTurns is used up).
         If we are on Player Turn -> end player turn, switch to enemy turn.
-        Reset 'hasMoved' flags for whichever side is active next.
+        Reset action states for whichever side is active next.
         """
-        if self.isPlayerTurn:
-            # We end Player Turn -> go to Enemy Turn
-            self.isPlayerTurn = False
+        if self.battle.phase not in (TurnPhase.PLAYER, TurnPhase.ENEMY):
+            return
+        if not self.is_local_turn():
+            self.message = "Waiting for the other player."
+            return
+        self.advance_turn()
+        self.emit_command({"op": "end_turn"})
+
+    def advance_turn(self):
+        """end_turn() without the turn-ownership check; also used for remote commands."""
+        if self.selected_unit:
+            self.cancel_selection()
+        self.group = []
+        ended_turn = self.battle.turn
+        self.battle.end_phase()
+        self.telemetry.record_turn_end(ended_turn, self.battle.phase.value, self.game_state.currentChapterId)
+        if self.battle.phase == TurnPhase.ENEMY:
             self.message = "Switched to Enemy Turn"
-            # Reset enemy hasMoved flags
-            for u in self.grid_units:
-                if u["side"] == "enemy":
-                    u["hasMoved"] = self.ACTION_STATE_NOT_YET
-        else:
-            # We end Enemy Turn -> go to next Player Turn
-            self.isPlayerTurn = True
-            self.grid_currentTurn += 1
+        elif self.battle.phase == TurnPhase.PLAYER:
             self.message = f"New Player Turn (Turn {self.grid_currentTurn})"
-            # Reset player hasMoved flags
-            for u in self.grid_units:
-                if u["side"] == "player":
-                    u["hasMoved"] = self.ACTION_STATE_NOT_YET
+        else:
+            self.message = f"Turn limit of {self.grid_maxTurns} reached!"
 
     def show_context_menu(self, pixel_x, pixel_y, can_attack):
         """
@@ -161,44 +312,48 @@ class GameManager:
             self.context_menu["visible"] = False
             self.message = "Menu closed."
 
+        if self.group:
+            self.order_group(grid_x, grid_y)
+            return
+
         if not self.selected_unit:
             # Attempt to select a unit belonging to the side whose turn it is
             clicked_unit = self.get_unit_at(grid_x, grid_y)
-            if clicked_unit and clicked_unit["hasMoved"] == self.ACTION_STATE_NOT_YET:
-                if (self.isPlayerTurn and clicked_unit["side"] == "player") \
-                   or (not self.isPlayerTurn and clicked_unit["side"] == "enemy"):
+            if clicked_unit and clicked_unit["hasMoved"] == ActionState.NOT_YET:
+                if self.battle.is_side_turn(clicked_unit["side"]) and self.is_local_side(clicked_unit["side"]):
                     self.selected_unit_before_action = dict(clicked_unit)
                     self.selected_unit = clicked_unit
-                    self.selected_unit["hasMoved"] = self.ACTION_STATE_SELECTED
-                    move_range = 5
-                    self.reachable_tiles = self.calculate_reachable_tiles((clicked_unit["x"], clicked_unit["y"]), move_range)
+                    self.battle.set_state(clicked_unit, ActionState.SELECTED)
+                    self.reachable_tiles = self.calculate_reachable_tiles((clicked_unit["x"], clicked_unit["y"]),
+                                                                          DEFAULT_MOVE_RANGE)
                     self.message = f"Selected unit {clicked_unit['unitId']}"
                 else:
                     self.message = "Not your unit or unit already moved."
             else:
                 self.message = "No valid unit selected."
         else:
-            if self.selected_unit["hasMoved"] == self.ACTION_STATE_ATTACK_NEED_TO_CONFRIM:
+            if self.selected_unit["hasMoved"] == ActionState.ATTACK_NEED_TO_CONFIRM:
                 # Check if the click is on an attackable tile
                 if (grid_x, grid_y) in self.attackable_tiles:
-                    self.selected_unit["hasMoved"] = self.ACTION_STATE_DONE
+                    self.battle.set_state(self.selected_unit, ActionState.DONE)
+                    self.record_committed_move(self.selected_unit)
                     # Perform the attack
                     defender = self.get_unit_at(grid_x, grid_y)
                     if defender:
-                        self.attack_unit(self.selected_unit, defender)
-                        if defender["HP"] > 0:
-                            self.attack_unit(defender, self.selected_unit)
+                        self.resolve_attack(self.selected_unit, defender)
+                    self.emit_command({"op": "act", "unit": unit_key(self.selected_unit),
+                                       "to": [self.selected_unit["x"], self.selected_unit["y"]],
+                                       "target": [grid_x, grid_y]})
                     self.context_menu["visible"] = False
                     self.attackable_tiles = []
                     self.attackable_tiles_drawing = []
                     self.message = f"{self.selected_unit['unitId']} finished attack."
-                    self.selected_unit["hasMoved"] = self.ACTION_STATE_DONE                    
                     self.selected_unit = None
                     self.selected_unit_before_action = None
                 else:
                     self.message = "Invalid attack target."
             # A unit is selected, show menu if the same cell is clicked, or attempt to move
-            elif self.selected_unit["hasMoved"] == self.ACTION_STATE_MOVED_NEED_TO_CONFRIM:
+            elif self.selected_unit["hasMoved"] == ActionState.MOVED_NEED_TO_CONFIRM:
                 # unit has moved and waiting to execute attack/cast/... 
                 # no-op for any left click. keep the menu open
                 self.context_menu["visible"] = True
@@ -208,16 +363,18 @@ class GameManager:
                 can_attack = self.has_adjacent_enemy(self.selected_unit)
                 # Show menu near the mouse click
                 self.show_context_menu(mouse_pos[0], mouse_pos[1], can_attack)
-                self.selected_unit["hasMoved"] = self.ACTION_STATE_MOVED_NEED_TO_CONFRIM
+                self.battle.set_state(self.selected_unit, ActionState.MOVED_NEED_TO_CONFIRM)
                 self.message = f"Showing menu for unit {self.selected_unit['unitId']}"
             elif (grid_x, grid_y) in self.reachable_tiles:
+                from_pos = (self.selected_unit["x"], self.selected_unit["y"])
                 self.selected_unit["x"] = grid_x
                 self.selected_unit["y"] = grid_y
+                self.on_unit_moved(self.selected_unit, from_pos)
 
                 can_attack = self.has_adjacent_enemy(self.selected_unit)
                 # Show menu near the mouse click
                 self.show_context_menu(mouse_pos[0], mouse_pos[1], can_attack)
-                self.selected_unit["hasMoved"] = self.ACTION_STATE_MOVED_NEED_TO_CONFRIM
+                self.battle.set_state(self.selected_unit, ActionState.MOVED_NEED_TO_CONFIRM)
                 self.message = f"{self.selected_unit['unitId']} moved to ({grid_x},{grid_y})"
                 
                 self.reachable_tiles = []
@@ -225,6 +382,102 @@ class GameManager:
                 # If user clicked a non-reachable tile, no-op
                 self.message = "Invalid move or cancelled selection."
 
+    def cancel_selection(self):
+        """Undo the selected unit's pending action (right-click) and close any menu."""
+        if self.selected_unit:
+            # Restore the pre-action snapshot, but let the ledger own the state change
+            state = self.selected_unit["hasMoved"]
+            from_pos = (self.selected_unit["x"], self.selected_unit["y"])
+            self.selected_unit.clear()
+            self.selected_unit.update(self.selected_unit_before_action)
+            self.selected_unit["hasMoved"] = state
+            self.battle.set_state(self.selected_unit, ActionState.NOT_YET)
+            self.on_unit_moved(self.selected_unit, from_pos, animate=False)
+            self.selected_unit_before_action = None
+            self.selected_unit = None
+        self.group = []
+        self.attackable_tiles = []
+        self.attackable_tiles_drawing = []
+        self.reachable_tiles = []
+        self.context_menu["visible"] = False
+        self.message = "Pop-up menu or attack status cancelled by right-click."
+
+    def select_group(self, x0, y0, x1, y1):
+        """Box-select every unit of the local side to move that hasn't acted yet, within the tile rect."""
+        if self.selected_unit:
+            self.cancel_selection()
+        min_x, max_x = sorted((x0, x1))
+        min_y, max_y = sorted((y0, y1))
+        self.group = [u for u in self.grid_units
+                      if min_x <= u["x"] <= max_x and min_y <= u["y"] <= max_y
+                      and u["hasMoved"] == ActionState.NOT_YET
+                      and self.battle.is_side_turn(u["side"]) and self.is_local_side(u["side"])]
+        if self.group:
+            self.message = f"{len(self.group)} units selected, click a destination."
+        else:
+            self.message = "No units ready to move in that area."
+
+    def order_group(self, dest_x, dest_y):
+        """
+        Move the whole group towards (dest_x, dest_y) in one go (see group_orders.py).
+        Every unit that moves is done for the turn, as if it had moved and stayed.
+        """
+        w, h = self.current_grid_data["width"], self.current_grid_data["height"]
+        group, self.group = self.group, []
+        if not (0 <= dest_x < w and 0 <= dest_y < h):
+            self.message = "Group order cancelled."
+            return
+        moves = plan_group_move(group, self.grid_units,
+                                self.distance_fields.field_to_tile(dest_x, dest_y),
+                                self.distance_fields.passable, DEFAULT_MOVE_RANGE)
+        for unit in group:
+            if id(unit) not in moves:
+                continue
+            from_pos = (unit["x"], unit["y"])
+            unit["x"], unit["y"] = moves[id(unit)]
+            self.on_unit_moved(unit, from_pos)
+            self.battle.set_state(unit, ActionState.DONE)
+            self.telemetry.record_move(unit, from_pos, self.battle.turn)
+            self.emit_command({"op": "act", "unit": unit_key(unit), "to": [unit["x"], unit["y"]]})
+        self.message = f"Group order: {len(moves)} of {len(group)} units moved toward ({dest_x},{dest_y})."
+
+    def on_unit_moved(self, unit, from_pos, animate=True):
+        """
+        Call after changing a unit's x/y (it was at from_pos) so incremental
+        subsystems can follow. Nothing happens if the unit ended where it started.
+        An undone move (animate=False) snaps back without the move animation.
+        """
+        if (unit["x"], unit["y"]) == from_pos:
+            return
+        self.grid_revision += 1
+        if self.visibility:
+            self.visibility.update_unit(unit)
+        if self.distance_fields:
+            self.distance_fields.update_unit(unit)
+        if self.unit_animator and animate:
+            self.unit_animator.play(unit, "move")
+        if self.minimap:
+            self.minimap.update_unit(unit)
+
+    def on_unit_removed(self, unit):
+        """Call after a unit leaves the battle (e.g. defeated)."""
+        self.grid_revision += 1
+        self.battle.remove_unit(unit)
+        if self.visibility:
+            self.visibility.remove_unit(unit)
+        if self.distance_fields:
+            self.distance_fields.remove_unit(unit)
+        if self.unit_animator:
+            self.unit_animator.forget(unit)
+        if self.minimap:
+            self.minimap.remove_unit(unit)
+
+    def record_committed_move(self, unit):
+        """Log the selected unit's move to telemetry once its action is final (undone moves never count)."""
+        before = self.selected_unit_before_action
+        if before and (before["x"], before["y"]) != (unit["x"], unit["y"]):
+            self.telemetry.record_move(unit, (before["x"], before["y"]), self.battle.turn)
+
     def has_adjacent_enemy(self, unit):
         x, y = unit["x"], unit["y"]
         # Check if there's an enemy in (x±1, y) or (x, y±1)
@@ -237,8 +490,13 @@ class GameManager:
 
     def handle_stay_action(self):
         # self.selected_unit action is completed
-        # self.selected_unit["hasMoved"] = self.ACTION_STATE_DONE
+        if self.selected_unit:
+            self.battle.set_state(self.selected_unit, ActionState.DONE)
+            self.record_committed_move(self.selected_unit)
+            self.emit_command({"op": "act", "unit": unit_key(self.selected_unit),
+                               "to": [self.selected_unit["x"], self.selected_unit["y"]]})
         self.selected_unit = None
+        self.selected_unit_before_action = None
         self.reachable_tiles = []
         self.context_menu["visible"] = False
         self.message = "Stay action completed."
@@ -250,7 +508,7 @@ class GameManager:
         """
         if not self.selected_unit:
             return
-        self.selected_unit["hasMoved"] = self.ACTION_STATE_ATTACK_NEED_TO_CONFRIM
+        self.battle.set_state(self.selected_unit, ActionState.ATTACK_NEED_TO_CONFIRM)
         self.attackable_tiles = []
         self.attackable_tiles_drawing = []
         x, y = self.selected_unit["x"], self.selected_unit["y"]
@@ -265,11 +523,12 @@ class GameManager:
 
     def calculate_reachable_tiles(self, start_xy, move_range):
         """
-        Simple BFS ignoring obstacles or blocked tiles:
+        Simple BFS around units and blocked tiles (grid.blockedTiles):
         Returns a list of (x,y) within 'move_range' steps from start_xy.
         """
         w = self.current_grid_data.get("width")
         h = self.current_grid_data.get("height")
+        passable = self.distance_fields.passable
         visited = set()
         queue = deque()
         queue.append((start_xy[0], start_xy[1], 0))  # (x, y, distance)
@@ -285,23 +544,71 @@ class GameManager:
                 reachable.append((x, y))
                 # Explore neighbors
                 for nx, ny in [(x+1,y),(x-1,y),(x,y+1),(x,y-1)]:
-                    if 0 <= nx < w and 0 <= ny < h:
+                    if 0 <= nx < w and 0 <= ny < h and passable[ny, nx]:
                         if (nx, ny) not in visited:
-                            # Optionally, also skip if there's an obstacle or a unit occupying that tile?
-                            # For now, ignoring collisions:
                             visited.add((nx, ny))
                             queue.append((nx, ny, dist+1))
         return reachable
 
+    def apply_command(self, command):
+        """
+        Replay a command issued on another machine. Only completed actions are
+        sent (selection, menus and right-click undo stay local), so a unit's
+        whole turn arrives as one "act". Returns False if it doesn't fit the
+        local battle, which means the two sides have drifted apart.
+        """
+        op = command.get("op")
+        if op == "end_turn":
+            if self.battle.phase not in (TurnPhase.PLAYER, TurnPhase.ENEMY):
+                return False
+            self.advance_turn()
+            return True
+        if op != "act":
+            return False
+        unit = next((u for u in self.grid_units if unit_key(u) == command.get("unit")), None)
+        if unit is None or not self.battle.is_side_turn(unit["side"]) or unit["hasMoved"] != ActionState.NOT_YET:
+            return False
+        x, y = command["to"]
+        from_pos = (unit["x"], unit["y"])
+        unit["x"], unit["y"] = x, y
+        self.on_unit_moved(unit, from_pos)
+        self.battle.set_state(unit, ActionState.DONE)
+        if (x, y) != from_pos:
+            self.telemetry.record_move(unit, from_pos, self.battle.turn)
+        target = command.get("target")
+        defender = self.get_unit_at(*target) if target else None
+        if defender:
+            self.resolve_attack(unit, defender)
+        else:
+            self.message = f"{unit['unitId']} moved to ({x},{y})"
+        return True
+
+    def resolve_attack(self, attacker, defender):
+        """Attack, then counter-attack if the defender survives."""
+        self.attack_unit(attacker, defender)
+        if defender["HP"] > 0:
+            self.attack_unit(defender, attacker)
+
     def attack_unit(self, attacker, defender):
         """Simple damage formula: defender.HP -= attacker.attack. If HP <= 0, remove them."""
         defender["HP"] -= attacker["attack"]
+        self.grid_revision += 1
+        self.telemetry.record_attack(attacker, defender, attacker["attack"])
+        if self.unit_animator:
+            self.unit_animator.play(attacker, "attack")
         self.message = f"{attacker['unitId']} attacked {defender['unitId']}!"
         if defender["HP"] <= 0:
             self.message += f" {defender['unitId']} is defeated!"
             # Remove from grid_units
             if defender in self.grid_units:
                 self.grid_units.remove(defender)
+                self.on_unit_removed(defender)
+
+    def distance_to_nearest_foe(self, unit):
+        """Steps from unit to the closest opposing unit (shared field), or None."""
+        foe_side = "enemy" if unit["side"] == "player" else "player"
+        field = self.distance_fields.field_to_side(foe_side)
+        return self.distance_fields.distance(field, unit["x"], unit["y"])
 
     def get_unit_at(self, gx, gy):
         """Return the unit dict at grid coords (gx, gy), or None if empty."""
@@ -312,20 +619,31 @@ class GameManager:
 
     def all_player_units_done(self):
         """
-        Returns True if all units belonging to the side 'player' have 'hasMoved=True'
-        for the current turn.
+        Returns True if every living 'player' unit is DONE for the current turn.
         """
-        for u in self.grid_units:
-            if u["side"] == "player" and u["hasMoved"] == self.ACTION_STATE_DONE:
-                return False
-        return True
+        return self.battle.all_done("player")
 
     def check_chapter_completion(self):
-        """Check if the current chapter is completed by checking if all enemy units are defeated."""
-        for u in self.grid_units:
-            if u["side"] == "enemy" and u["HP"] > 0:
-                return False
-        return True
+        """Check if the current chapter is completed: all enemy units are defeated."""
+        if self.battle.is_victory():
+            self.battle.set_phase(TurnPhase.VICTORY)
+            return True
+        return False
+
+    def check_chapter_defeat(self):
+        """True if every player unit is gone or the chapter's turn limit ran out."""
+        if self.battle.is_defeat():
+            self.battle.set_phase(TurnPhase.DEFEAT)
+            return True
+        return False
+
+    def on_chapter_defeat(self):
+        chapter_id = self.game_state.currentChapterId
+        self.game_state.currentChapterState = {}
+        if self.battle.out_of_turns:
+            self.message = f"Defeat in Chapter {chapter_id}: out of turns."
+        else:
+            self.message = f"Defeat in Chapter {chapter_id}: all units lost."
 
     def on_chapter_victory(self):
         """Simulates beating the current chapter."""
@@ -335,6 +653,9 @@ class GameManager:
             self.message = "Error: current chapter not found!"
             return
         
+        # The battle is over, drop any suspended state for it
+        self.game_state.currentChapterState = {}
+
         # Trigger "onVictory" events
         self.trigger_events(chapter, "onVictory")
 
@@ -358,6 +679,7 @@ class GameManager:
         for event in events:
             if event.get("triggerPoint") == trigger_point:
                 actions = event.get("actions", [])
+                self.telemetry.record_event_trigger(chapter.get("chapterId", 0), trigger_point, len(actions))
                 self.handle_event_actions(actions)
 
     def handle_event_actions(self, actions):
@@ -382,11 +704,13 @@ class GameManager:
     # Existing debug info in PLAY mode
     def draw_status(self, screen):
         chapter_id = self.game_state.currentChapterId
+        cache = self.assets.memory_report()
         lines = [
             f"Current Chapter: {chapter_id}",
             f"Coins: {self.game_state.coins}",
             f"Heroes: {len(self.game_state.heroes)}",
             f"Message: {self.message}",
+            f"Asset cache: {cache['bytes'] / (1024 * 1024):.1f} MB in {cache['entries']} surfaces",
             "Press 'v' = Victory, 'g' = Grid Mode, 's' = Save"
         ]
 
@@ -0,0 +1,68 @@
+"""
+Batched planner for group orders: one destination for a whole box-selected group.
+
+All units share one distance field towards the destination (DistanceFieldService
+caches it per tile), so the expensive search happens once per order instead of
+once per unit. Each unit then only runs a short BFS bounded by its move range
+over free tiles and takes the tile closest to the destination.
+
+Tile conflicts go through a reservation table (tile -> unit): every unit holds
+its start tile until it has been planned, then holds its end tile. Units
+closest to the destination plan first so the front of the group clears the
+way; units that found no room get a second pass once the others have moved.
+The result clusters the group around the destination.
+"""
+from collections import deque
+from .distance_fields import UNREACHABLE
+
+GROUP_PLAN_PASSES = 2
+
+def reachable_within(start, move_range, passable, reserved):
+    """{(x, y): steps} for tiles reachable from start without entering reserved tiles."""
+    h, w = passable.shape
+    steps = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        d = steps[(x, y)]
+        if d == move_range:
+            continue
+        for nx, ny in [(x+1,y),(x-1,y),(x,y+1),(x,y-1)]:
+            if (0 <= nx < w and 0 <= ny < h and (nx, ny) not in steps
+                    and passable[ny, nx] and (nx, ny) not in reserved):
+                steps[(nx, ny)] = d + 1
+                queue.append((nx, ny))
+    return steps
+
+def plan_group_move(group, all_units, field, passable, move_range):
+    """
+    Plan a move for every unit in 'group' towards the goal of 'field'.
+    Returns {id(unit): (x, y)} for the units that should move; the units
+    themselves are not touched.
+    """
+    reserved = {(u["x"], u["y"]): id(u) for u in all_units}
+
+    def goal_distance(tile):
+        d = int(field[tile[1], tile[0]])
+        return float("inf") if d == UNREACHABLE else d
+
+    pending = sorted(group, key=lambda u: goal_distance((u["x"], u["y"])))
+    moves = {}
+    for _ in range(GROUP_PLAN_PASSES):
+        stuck = []
+        for unit in pending:
+            start = (unit["x"], unit["y"])
+            del reserved[start]
+            steps = reachable_within(start, move_range, passable, reserved)
+            best = min(steps, key=lambda t: (goal_distance(t), steps[t]))
+            if goal_distance(best) < goal_distance(start):
+                moves[id(unit)] = best
+            else:
+                best = start
+                stuck.append(unit)
+            reserved[best] = id(unit)
+        if not stuck or len(stuck) == len(pending):
+            break
+        # Units that moved freed their start tiles; give the stuck ones another go
+        pending = stuck
+    return moves
@@ -0,0 +1,86 @@
+import pygame
+from .constants import TILE_SIZE, STATUS_BAR_HEIGHT, TOOLTIP_FONT_SIZE, TOOLTIP_BG_COLOR, TOOLTIP_PADDING, WHITE
+
+class HoverTracker:
+    """
+    Grid-mode hover tooltip.
+
+    MOUSEMOTION events only record the latest position; update() runs once
+    per frame, and only looks the unit up again when the hovered tile or the
+    battle itself (manager.grid_revision) changed. The tooltip panel is
+    rendered to a cached surface and re-rendered only when its text changes.
+    It is drawn on its own and never touches manager.message.
+    """
+    def __init__(self):
+        self.font = pygame.font.SysFont(None, TOOLTIP_FONT_SIZE)
+        self.reset()
+
+    def reset(self):
+        self.mouse_pos = None
+        self._tile = None
+        self._revision = None
+        self._lines = None
+        self.panel = None   # cached tooltip Surface, None when nothing is hovered
+
+    def on_motion(self, pos):
+        self.mouse_pos = pos
+
+    def update(self, manager, camera_x, camera_y):
+        if self.mouse_pos is None:
+            return
+        mouse_x, mouse_y = self.mouse_pos
+        if mouse_y <= STATUS_BAR_HEIGHT:
+            tile = None
+        else:
+            tile = ((mouse_x + camera_x) // TILE_SIZE, (mouse_y + camera_y - STATUS_BAR_HEIGHT) // TILE_SIZE)
+        if tile == self._tile and manager.grid_revision == self._revision:
+            return
+        self._tile = tile
+        self._revision = manager.grid_revision
+
+        unit = manager.get_unit_at(*tile) if tile else None
+        if unit and manager.visibility and not manager.visibility.can_viewer_see(unit):
+            unit = None  # don't leak units hidden by the fog
+        self._set_lines(self._describe(manager, unit) if unit else None)
+
+    def _describe(self, manager, unit):
+        lines = [
+            f"{unit['unitId']} ({unit['side']})",
+            f"HP {unit['HP']}  ATK {unit['attack']}  DEF {unit.get('defense', 0)}  MP {unit.get('MP', 0)}",
+        ]
+        # Skipped under fog, it would give away hidden enemies
+        if not manager.visibility:
+            foe_dist = manager.distance_to_nearest_foe(unit)
+            if foe_dist is not None:
+                lines.append(f"Nearest foe: {foe_dist} tiles")
+        return lines
+
+    def _set_lines(self, lines):
+        if lines == self._lines:
+            return
+        self._lines = lines
+        if not lines:
+            self.panel = None
+            return
+        rendered = [self.font.render(line, True, WHITE) for line in lines]
+        width = max(s.get_width() for s in rendered) + 2 * TOOLTIP_PADDING
+        height = sum(s.get_height() for s in rendered) + 2 * TOOLTIP_PADDING
+        self.panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.panel.fill(TOOLTIP_BG_COLOR)
+        y = TOOLTIP_PADDING
+        for s in rendered:
+            self.panel.blit(s, (TOOLTIP_PADDING, y))
+            y += s.get_height()
+
+    def draw(self, screen):
+        if self.panel is None or self.mouse_pos is None:
+            return
+        screen_w, screen_h = screen.get_size()
+        # Next to the cursor, flipped to stay inside the window
+        x = self.mouse_pos[0] + 16
+        y = self.mouse_pos[1] + 16
+        if x + self.panel.get_width() > screen_w:
+            x = self.mouse_pos[0] - 8 - self.panel.get_width()
+        if y + self.panel.get_height() > screen_h:
+            y = self.mouse_pos[1] - 8 - self.panel.get_height()
+        screen.blit(self.panel, (max(0, x), max(STATUS_BAR_HEIGHT, y)))
@@ -0,0 +1,106 @@
+import math
+import numpy as np
+import pygame
+from .constants import (MINIMAP_MAX_SIZE, MINIMAP_MARGIN, MINIMAP_BORDER_COLOR, MINIMAP_CAMERA_COLOR,
+                        MINIMAP_PLAYER_COLOR, MINIMAP_ENEMY_COLOR, GRID_FALLBACK_COLOR)
+
+SIDE_INDEX = {"player": 0, "enemy": 1}
+
+class Minimap:
+    """
+    Small overview of the whole grid in a corner of the grid view.
+
+    The downscaled background is rendered once per chapter. Unit markers are
+    painted onto a composed copy of it and patched per cell when units move
+    or die; each minimap cell keeps a per-side unit count so several units
+    sharing one cell don't erase each other. A frame costs one blit plus the
+    camera rectangle outline.
+
+    Small maps get several pixels per tile; maps longer than MINIMAP_MAX_SIZE
+    tiles fold several tiles into each pixel so the minimap never outgrows it.
+    """
+    def __init__(self, grid_w, grid_h, background, hidden_side=None):
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.hidden_side = hidden_side     # side whose markers are never drawn (fog of war)
+
+        # Each minimap cell covers step x step tiles and is cell x cell pixels,
+        # chosen so the longer side fits in MINIMAP_MAX_SIZE
+        longest = max(grid_w, grid_h)
+        self.step = max(1, math.ceil(longest / MINIMAP_MAX_SIZE))
+        self.cell = max(1, MINIMAP_MAX_SIZE // longest)
+        self.cells_w = math.ceil(grid_w / self.step)
+        self.cells_h = math.ceil(grid_h / self.step)
+        self.width = self.cells_w * self.cell
+        self.height = self.cells_h * self.cell
+
+        self.base = pygame.Surface((self.width, self.height)).convert()
+        if background:
+            pygame.transform.smoothscale(background, (self.width, self.height), self.base)
+        else:
+            self.base.fill(GRID_FALLBACK_COLOR)
+        self.surface = self.base.copy()
+
+        self.counts = np.zeros((len(SIDE_INDEX), self.cells_h, self.cells_w), dtype=np.int32)
+        self._positions = {}    # id(unit) -> (side index, cell x, cell y)
+        self.rect = pygame.Rect(0, 0, self.width, self.height)   # on-screen placement
+
+    def place(self, screen_w, screen_h):
+        """Anchor the minimap to the bottom-right corner of the window."""
+        self.rect.bottomright = (screen_w - MINIMAP_MARGIN, screen_h - MINIMAP_MARGIN)
+
+    def add_unit(self, unit):
+        side = SIDE_INDEX[unit["side"]]
+        cx, cy = unit["x"] // self.step, unit["y"] // self.step
+        self._positions[id(unit)] = (side, cx, cy)
+        self.counts[side, cy, cx] += 1
+        self._patch(cx, cy)
+
+    def update_unit(self, unit):
+        entry = self._positions.get(id(unit))
+        if entry is None:
+            return
+        side, old_x, old_y = entry
+        cx, cy = unit["x"] // self.step, unit["y"] // self.step
+        if (old_x, old_y) == (cx, cy):
+            return
+        self.counts[side, old_y, old_x] -= 1
+        self._patch(old_x, old_y)
+        self._positions[id(unit)] = (side, cx, cy)
+        self.counts[side, cy, cx] += 1
+        self._patch(cx, cy)
+
+    def remove_unit(self, unit):
+        entry = self._positions.pop(id(unit), None)
+        if entry is None:
+            return
+        side, x, y = entry
+        self.counts[side, y, x] -= 1
+        self._patch(x, y)
+
+    def _patch(self, x, y):
+        """Repaint one cell: the player marker wins, then enemy, else the background."""
+        rect = (x * self.cell, y * self.cell, self.cell, self.cell)
+        if self.hidden_side != "player" and self.counts[SIDE_INDEX["player"], y, x] > 0:
+            self.surface.fill(MINIMAP_PLAYER_COLOR, rect)
+        elif self.hidden_side != "enemy" and self.counts[SIDE_INDEX["enemy"], y, x] > 0:
+            self.surface.fill(MINIMAP_ENEMY_COLOR, rect)
+        else:
+            self.surface.blit(self.base, rect[:2], rect)
+
+    def contains(self, pos):
+        return self.rect.collidepoint(pos)
+
+    def to_world(self, pos, tile_size):
+        """Map a click inside the minimap to world pixel coordinates."""
+        mx = (pos[0] - self.rect.x) / self.cell * self.step
+        my = (pos[1] - self.rect.y) / self.cell * self.step
+        return mx * tile_size, my * tile_size
+
+    def draw(self, screen, camera_x, camera_y, view_w, view_h, tile_size):
+        screen.blit(self.surface, self.rect)
+        pygame.draw.rect(screen, MINIMAP_BORDER_COLOR, self.rect.inflate(2, 2), 1)
+        scale = self.cell / (self.step * tile_size)
+        cam_rect = pygame.Rect(self.rect.x + int(camera_x * scale), self.rect.y + int(camera_y * scale),
+                               max(1, int(view_w * scale)), max(1, int(view_h * scale)))
+        pygame.draw.rect(screen, MINIMAP_CAMERA_COLOR, cam_rect.clip(self.rect), 1)
@@ -0,0 +1,64 @@
+"""
+Stand-in relay for LAN battles (see netplay.py).
+
+Holds one room of two clients: the first to connect commands the "player"
+side (and is the host), the second the "enemy" side. Everything a client
+sends is forwarded verbatim to the other one; the relay never looks inside
+game messages.
+
+    python -m gameEngine.net_relay [port]
+"""
+import asyncio
+import json
+import sys
+from .constants import NET_DEFAULT_PORT
+
+SIDES = ("player", "enemy")
+
+class Relay:
+    def __init__(self):
+        self.clients = {}    # side -> StreamWriter
+
+    def send(self, writer, message):
+        writer.write((json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8"))
+
+    async def handle(self, reader, writer):
+        side = next((s for s in SIDES if s not in self.clients), None)
+        if side is None:
+            self.send(writer, {"op": "disconnected", "reason": "room is full"})
+            writer.close()
+            return
+        self.clients[side] = writer
+        self.send(writer, {"op": "welcome", "side": side, "peers": len(self.clients)})
+        for other_side, other in self.clients.items():
+            if other_side != side:
+                self.send(other, {"op": "peer_joined", "side": side})
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for other_side, other in self.clients.items():
+                    if other_side != side:
+                        other.write(line)
+        except OSError:
+            pass
+        finally:
+            del self.clients[side]
+            for other in self.clients.values():
+                self.send(other, {"op": "peer_left", "side": side})
+            writer.close()
+
+async def serve(host="0.0.0.0", port=NET_DEFAULT_PORT, on_listening=None):
+    """Run the relay until cancelled. Port 0 picks a free port, passed to on_listening(port)."""
+    relay = Relay()
+    server = await asyncio.start_server(relay.handle, host, port)
+    port = server.sockets[0].getsockname()[1]
+    print(f"Relay listening on {host}:{port}")
+    if on_listening:
+        on_listening(port)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else NET_DEFAULT_PORT))
@@ -0,0 +1,190 @@
+"""
+Two-player LAN battles in lockstep.
+
+Each machine runs the full battle. Only completed commands travel over the
+wire ({"op": "act", ...} when a unit finishes its action, {"op": "end_turn"}),
+numbered in the order they were applied; turns alternate, so only one side
+ever issues commands and both apply them in the same order.
+
+Every NET_CHECKSUM_INTERVAL commands (and on every end_turn) the sender adds a
+CRC of its battle delta. A receiver that disagrees, or gets a command that
+doesn't fit its battle, asks for a resync and the host (the "player" side)
+answers with a snapshot: the battle delta against the chapter template, so it
+grows with what happened in the battle rather than with the map size.
+
+Messages are newline-delimited JSON through the relay (net_relay.py). The
+socket lives on an asyncio loop in a background thread; the pygame loop only
+ever calls NetClient.send() and NetClient.poll(), which never block.
+
+    python -m gameEngine.net_relay            # on one machine
+    python main.py --connect HOST:PORT        # on both
+"""
+import asyncio
+import json
+import queue
+import threading
+from .battle_snapshot import delta_checksum
+from .constants import NET_CHECKSUM_INTERVAL
+
+HOST_SIDE = "player"
+
+class NetClient:
+    """Connection to the relay, run on its own thread and asyncio loop."""
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._incoming = queue.SimpleQueue()
+        self._loop = asyncio.new_event_loop()
+        self._writer = None
+        self._backlog = []     # lines queued before the connection is up
+        self._thread = threading.Thread(target=self._run, name="net", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            self._incoming.put({"op": "disconnected", "reason": str(e)})
+            return
+        self._writer = writer
+        for data in self._backlog:
+            writer.write(data)
+        self._backlog = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._incoming.put(json.loads(line))
+        except (OSError, ValueError) as e:
+            self._incoming.put({"op": "disconnected", "reason": str(e)})
+            return
+        finally:
+            writer.close()
+        self._incoming.put({"op": "disconnected", "reason": "relay closed the connection"})
+
+    def send(self, message):
+        """Queue a message for the network thread (safe to call from the game loop)."""
+        data = (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+        self._loop.call_soon_threadsafe(self._write, data)
+
+    def _write(self, data):
+        if self._writer is None:
+            self._backlog.append(data)
+        elif not self._writer.is_closing():
+            self._writer.write(data)
+
+    def poll(self):
+        """Every message received since the last call, in arrival order."""
+        messages = []
+        while True:
+            try:
+                messages.append(self._incoming.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        if self._writer is not None:
+            self._loop.call_soon_threadsafe(self._writer.close)
+
+class NetSession:
+    """
+    Glue between a GameManager and a NetClient. Call poll() once per frame
+    while in grid mode; local commands go out as GameManager emits them.
+    """
+    def __init__(self, manager, client):
+        self.manager = manager
+        self.client = client
+        self.side = None          # assigned by the relay
+        self.peer_joined = False
+        self.seq = 0              # commands applied so far, local and remote
+        self.awaiting_snapshot = False
+        self.status = f"Connecting to {client.host}:{client.port}..."
+
+        manager.set_local_sides(set())   # nothing is ours until the relay says so
+        manager.on_command = self.on_local_command
+
+    @property
+    def is_host(self):
+        return self.side == HOST_SIDE
+
+    def on_grid_entered(self):
+        """Ask the host for its battle so both sides start from the same state."""
+        self.client.send({"op": "ready"})
+
+    def on_local_command(self, command):
+        self.seq += 1
+        message = dict(command, seq=self.seq)
+        if command["op"] == "end_turn" or self.seq % NET_CHECKSUM_INTERVAL == 0:
+            message["crc"] = delta_checksum(self.manager.capture_battle())
+        self.client.send(message)
+
+    def poll(self):
+        """Handle everything that arrived. Returns True if the battle changed."""
+        changed = False
+        for message in self.client.poll():
+            changed |= self.handle(message)
+        return changed
+
+    def handle(self, message):
+        op = message.get("op")
+        if op == "welcome":
+            self.side = message["side"]
+            self.manager.set_local_sides({self.side})
+            self.peer_joined = message.get("peers", 1) > 1
+            self.status = f"LAN: you command the {self.side} side"
+            self.manager.message = self.status if self.peer_joined else "Waiting for the other player to join..."
+        elif op == "peer_joined":
+            self.peer_joined = True
+            self.manager.message = "The other player joined."
+        elif op == "peer_left":
+            self.peer_joined = False
+            self.manager.message = "The other player left."
+        elif op == "disconnected":
+            self.status = f"LAN: disconnected ({message.get('reason')})"
+            self.manager.set_local_sides(None)   # carry on hot-seat
+            self.manager.message = self.status
+        elif op in ("ready", "resync"):
+            if self.is_host:
+                self.send_snapshot()
+        elif op == "snapshot":
+            self.manager.restore_battle(message["battle"])
+            self.seq = message["seq"]
+            self.awaiting_snapshot = False
+            self.manager.message = "Battle synced with the host."
+            return True
+        elif op in ("act", "end_turn"):
+            return self.apply_remote(message)
+        return False
+
+    def apply_remote(self, message):
+        if self.awaiting_snapshot:
+            return False     # the snapshot on its way already includes it
+        if message.get("seq") != self.seq + 1 or not self.manager.apply_command(message):
+            self.request_resync()
+            return False
+        self.seq += 1
+        if "crc" in message and message["crc"] != delta_checksum(self.manager.capture_battle()):
+            self.request_resync()
+        return True
+
+    def request_resync(self):
+        if self.is_host:
+            # The host's battle is authoritative; push it instead of asking
+            self.send_snapshot()
+        else:
+            self.awaiting_snapshot = True
+            self.client.send({"op": "resync"})
+            self.manager.message = "Out of sync, asking the host for its battle..."
+
+    def send_snapshot(self):
+        if not self.manager.current_grid_data:
+            return
+        # Only committed actions belong in a snapshot; drop a half-done local one
+        if self.manager.selected_unit:
+            self.manager.cancel_selection()
+        self.client.send({"op": "snapshot", "seq": self.seq, "battle": self.manager.capture_battle()})
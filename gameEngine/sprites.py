@@ -0,0 +1,145 @@
+"""
+Unit sprites and animations.
+
+The atlas is one image plus a JSON frame table, loaded and converted once per
+process. The table looks like:
+
+    {
+      "frameSize": [32, 32],
+      "frameMs": 150,
+      "sprites": {
+        "archer": {"idle": [[0, 0], [1, 0]], "move": [[2, 0], [3, 0]], "attack": [[4, 0]]}
+      }
+    }
+
+where each cell is [column, row] in the sheet. Units pick their sprite by
+'sprite' or 'type'; anything without an entry falls back to the built-in
+placeholder squares for its side, so chapters work without any art.
+"""
+
+import json
+import os
+import pygame
+from .constants import UNIT_ATLAS_IMAGE, UNIT_ATLAS_TABLE, UNIT_FRAME_MS
+from .asset_manager import get_asset_manager
+
+ANIMATION_HOLD_MS = {"move": 400, "attack": 500}   # how long one-shot animations play
+
+# Built-in placeholder colours per side: (ready, already acted)
+PLACEHOLDER_COLORS = {
+    "player": ((0, 255, 0), (1, 150, 32)),
+    "enemy": ((255, 0, 0), (139, 0, 0)),
+}
+
+_shared_atlas = None
+
+def get_unit_atlas(tile_size):
+    """Return the process-wide atlas, loading it on first use (needs a display mode set)."""
+    global _shared_atlas
+    if _shared_atlas is None or _shared_atlas.tile_size != tile_size:
+        _shared_atlas = SpriteAtlas(tile_size)
+    return _shared_atlas
+
+class SpriteAtlas:
+    def __init__(self, tile_size, image_path=UNIT_ATLAS_IMAGE, table_path=UNIT_ATLAS_TABLE):
+        self.tile_size = tile_size
+        self.frame_ms = UNIT_FRAME_MS
+        # (sprite key, animation, acted) -> list of converted Surfaces
+        self.frames = {}
+        self._build_placeholders()
+        if os.path.exists(image_path) and os.path.exists(table_path):
+            try:
+                self._load_sheet(image_path, table_path)
+            except Exception as e:
+                print(f"Failed to load unit atlas: {e}")
+
+    def _load_sheet(self, image_path, table_path):
+        with open(table_path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+        sheet = get_asset_manager().acquire(image_path, alpha=True)
+        if sheet is None:
+            return
+        t = self.tile_size
+        fw, fh = table.get("frameSize", [t, t])
+        if (fw, fh) != (t, t):
+            # Scale the whole sheet once instead of every frame at draw time
+            cols, rows = sheet.get_width() // fw, sheet.get_height() // fh
+            sheet = pygame.transform.smoothscale(sheet, (cols * t, rows * t))
+        self.frame_ms = table.get("frameMs", self.frame_ms)
+
+        for key, anims in table.get("sprites", {}).items():
+            for anim, cells in anims.items():
+                ready = [sheet.subsurface((c * t, r * t, t, t)) for c, r in cells]
+                if not ready:
+                    continue
+                self.frames[(key, anim, False)] = ready
+                self.frames[(key, anim, True)] = [self._dimmed(f) for f in ready]
+
+    def _dimmed(self, surf):
+        dim = surf.copy()
+        dim.fill((140, 140, 140), special_flags=pygame.BLEND_RGB_MULT)
+        return dim
+
+    def _square(self, color, dx=0, dy=0, flash=False):
+        t = self.tile_size
+        surf = pygame.Surface((t, t), pygame.SRCALPHA).convert_alpha()
+        surf.fill(color, (dx, dy, t, t))
+        if flash:
+            pygame.draw.rect(surf, (255, 255, 255), (dx, dy, t, t), max(1, t // 10))
+        return surf
+
+    def _build_placeholders(self):
+        for side, colors in PLACEHOLDER_COLORS.items():
+            for acted, color in ((False, colors[0]), (True, colors[1])):
+                self.frames[(side, "idle", acted)] = [self._square(color), self._square(color, 0, -1)]
+                self.frames[(side, "move", acted)] = [self._square(color, dx) for dx in (-2, 0, 2, 0)]
+                self.frames[(side, "attack", acted)] = [self._square(color, flash=True), self._square(color)]
+
+    def frames_for(self, unit, anim, acted):
+        key = unit.get("sprite") or unit.get("type")
+        frames = self.frames.get((key, anim, acted)) or self.frames.get((key, "idle", acted))
+        return frames or self.frames[(unit["side"], anim, acted)]
+
+class UnitAnimator:
+    """
+    Draws every unit in the viewport with one Surface.blits call.
+    All units share one clock, so units in the same animation show the same
+    frame and we never track per-unit timers for idle loops.
+    """
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self._playing = {}   # id(unit) -> (animation, end tick in ms)
+
+    def play(self, unit, anim):
+        self._playing[id(unit)] = (anim, pygame.time.get_ticks() + ANIMATION_HOLD_MS.get(anim, 0))
+
+    def forget(self, unit):
+        self._playing.pop(id(unit), None)
+
+    def draw(self, screen, units, camera_x, camera_y, top, ready_state, can_see=None):
+        now = pygame.time.get_ticks()
+        tick = now // self.atlas.frame_ms
+        t = self.atlas.tile_size
+        screen_w, screen_h = screen.get_size()
+
+        # Tile range touched by the viewport (partially visible tiles included)
+        min_tx, max_tx = camera_x // t, (camera_x + screen_w - 1) // t
+        min_ty, max_ty = camera_y // t, (camera_y + screen_h - top - 1) // t
+
+        batch = []
+        for unit in units:
+            ux, uy = unit["x"], unit["y"]
+            if not (min_tx <= ux <= max_tx and min_ty <= uy <= max_ty):
+                continue
+            if can_see and not can_see(unit):
+                continue
+            anim = "idle"
+            playing = self._playing.get(id(unit))
+            if playing:
+                if playing[1] > now:
+                    anim = playing[0]
+                else:
+                    del self._playing[id(unit)]
+            frames = self.atlas.frames_for(unit, anim, unit["hasMoved"] != ready_state)
+            batch.append((frames[tick % len(frames)], (ux * t - camera_x, uy * t + top - camera_y)))
+        screen.blits(batch, doreturn=False)
@@ -0,0 +1,89 @@
+"""
+Staged startup helpers.
+
+main() brings up only what the menu needs (display + font) and hands the
+rest (chapter parsing, save scanning, the grid engine imports) to background
+tasks, so time to first frame doesn't grow with the amount of content.
+
+Run with --trace-startup (or CCZ_TRACE_STARTUP=1) to print how long each
+phase took once startup has settled.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupTrace:
+    """Collects (phase, start, duration) timings relative to process start."""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.phases = []
+        self._lock = threading.Lock()
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter() - start)
+
+    def mark(self, name):
+        """Record a point in time (e.g. the first frame) as a zero-length phase."""
+        self._record(name, time.perf_counter(), 0.0)
+
+    def _record(self, name, start, duration):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.phases.append((name, start - self.origin, duration,
+                                threading.current_thread().name))
+
+    def report(self):
+        """Print the collected phases once, ordered by start time."""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        print("Startup trace (ms since start / duration / thread):")
+        for name, start, duration, thread in phases:
+            print(f"  {start * 1000:8.1f}  {duration * 1000:8.1f}  {thread:<14} {name}")
+
+class BackgroundTask:
+    """
+    Run fn() on a daemon thread. The game loop polls done() each frame and
+    only calls result() once it's ready, or when it truly needs the value
+    (result() then waits). Exceptions from fn are re-raised by result().
+    """
+    def __init__(self, name, fn, trace=None):
+        self.name = name
+        self._fn = fn
+        self._trace = trace
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            if self._trace:
+                with self._trace.phase(self.name):
+                    self._result = self._fn()
+            else:
+                self._result = self._fn()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -0,0 +1,193 @@
+"""
+Battle telemetry: typed events recorded into a preallocated ring buffer and
+flushed in batches by a background thread to rotating newline-delimited JSON
+files (telemetry/*.ndjson), which telemetry_collector.py ingests.
+
+Recording is a handful of array stores: every event is seven integers written
+into fixed-size columns, and names (unit ids, phases, trigger points) are
+interned to small ids the first time they are seen. Nothing on the game
+thread formats, locks or touches the disk. If the writer falls a whole
+buffer behind, the oldest events are dropped and the drop is logged.
+
+Off unless main.py is started with --telemetry (or CCZ_TELEMETRY=1).
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from .constants import TELEMETRY_CAPACITY, TELEMETRY_FLUSH_INTERVAL, TELEMETRY_MAX_FILE_BYTES
+
+# Event kinds and the meaning of their five integer fields (str = interned name)
+MOVE, ATTACK, TURN_END, EVENT_TRIGGER, FRAME_SPIKE = range(5)
+EVENT_SCHEMA = {
+    # steps = Manhattan distance from where the unit stood
+    MOVE: ("move", (("unit", str), ("x", int), ("y", int), ("steps", int), ("turn", int))),
+    ATTACK: ("attack", (("attacker", str), ("defender", str), ("damage", int), ("hp", int))),
+    TURN_END: ("turn_end", (("turn", int), ("next_phase", str), ("chapter", int))),
+    EVENT_TRIGGER: ("event_trigger", (("chapter", int), ("trigger", str), ("actions", int))),
+    FRAME_SPIKE: ("frame_spike", (("ms", int),)),
+}
+
+_shared_telemetry = None
+
+def get_telemetry():
+    """Return the process-wide Telemetry (created on first use, disabled until start())."""
+    global _shared_telemetry
+    if _shared_telemetry is None:
+        _shared_telemetry = Telemetry()
+    return _shared_telemetry
+
+class Telemetry:
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        assert capacity & (capacity - 1) == 0, "capacity must be a power of two"
+        self.enabled = False
+        self.capacity = capacity
+        self._mask = capacity - 1
+        # One preallocated column per field
+        self._time = array("q", bytes(8 * capacity))
+        self._kind = array("q", bytes(8 * capacity))
+        self._a = array("q", bytes(8 * capacity))
+        self._b = array("q", bytes(8 * capacity))
+        self._c = array("q", bytes(8 * capacity))
+        self._d = array("q", bytes(8 * capacity))
+        self._e = array("q", bytes(8 * capacity))
+        self._written = 0        # events recorded (only the game thread advances it)
+        self._flushed = 0        # events handed to the writer (only the flush thread advances it)
+        self.dropped = 0
+        self._names = []         # interned id -> name
+        self._name_ids = {}
+        self._origin_ns = time.perf_counter_ns()
+        self._origin_wall = time.time()
+
+        self._directory = None
+        self._file = None
+        self._file_path = None
+        self._file_index = 0
+        self._session = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- recording (game thread) ---
+
+    def intern(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def record(self, kind, a=0, b=0, c=0, d=0, e=0):
+        if not self.enabled:
+            return
+        i = self._written & self._mask
+        self._time[i] = time.perf_counter_ns() - self._origin_ns
+        self._kind[i] = kind
+        self._a[i] = a
+        self._b[i] = b
+        self._c[i] = c
+        self._d[i] = d
+        self._e[i] = e
+        self._written += 1
+
+    def record_move(self, unit, from_pos, turn):
+        if self.enabled:
+            x, y = unit["x"], unit["y"]
+            self.record(MOVE, self.intern(unit["unitId"]), x, y,
+                        abs(x - from_pos[0]) + abs(y - from_pos[1]), turn)
+
+    def record_attack(self, attacker, defender, damage):
+        if self.enabled:
+            self.record(ATTACK, self.intern(attacker["unitId"]), self.intern(defender["unitId"]),
+                        damage, defender["HP"])
+
+    def record_turn_end(self, turn, next_phase, chapter_id):
+        if self.enabled:
+            self.record(TURN_END, turn, self.intern(next_phase), chapter_id)
+
+    def record_event_trigger(self, chapter_id, trigger_point, action_count):
+        if self.enabled:
+            self.record(EVENT_TRIGGER, chapter_id, self.intern(trigger_point), action_count)
+
+    def record_frame_spike(self, ms):
+        if self.enabled:
+            self.record(FRAME_SPIKE, ms)
+
+    # --- writing (background thread) ---
+
+    def start(self, directory):
+        """Begin recording and flushing to 'directory'."""
+        if self.enabled:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._session = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._stop.clear()
+        self.enabled = True
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop recording, flush what's left and close the current file."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(TELEMETRY_FLUSH_INTERVAL):
+            self.flush()
+        self.flush()
+        self._rotate(reopen=False)
+
+    def flush(self):
+        """Write every event recorded since the last flush as one batch."""
+        written = self._written
+        start = self._flushed
+        if written == start:
+            return
+        start = max(start, written - self.capacity)
+        lines = [self._format(i & self._mask) for i in range(start, written)]
+        # Rows the game thread overwrote while we were reading them are suspect
+        overrun = self._written - self.capacity - start
+        if overrun > 0:
+            lines = lines[overrun:]
+        dropped = written - self._flushed - len(lines)
+        if dropped:
+            self.dropped += dropped
+            lines.insert(0, json.dumps({"e": "dropped", "count": dropped}))
+        self._flushed = written
+        self._write("\n".join(lines) + "\n")
+
+    def _format(self, i):
+        name, fields = EVENT_SCHEMA[self._kind[i]]
+        event = {"t": round(self._origin_wall + self._time[i] / 1e9, 6), "e": name}
+        for (field, kind), value in zip(fields, (self._a[i], self._b[i], self._c[i], self._d[i], self._e[i])):
+            if kind is str:
+                # A row being overwritten mid-read can pair a kind with foreign fields
+                value = self._names[value] if 0 <= value < len(self._names) else None
+            event[field] = value
+        return json.dumps(event, separators=(",", ":"))
+
+    def _write(self, text):
+        if self._file is None:
+            self._rotate()
+        self._file.write(text)
+        self._file.flush()
+        if self._file.tell() >= TELEMETRY_MAX_FILE_BYTES:
+            self._rotate()
+
+    def _rotate(self, reopen=True):
+        """Close the current file (renaming it so the collector picks it up) and open the next."""
+        if self._file is not None:
+            self._file.close()
+            os.replace(self._file_path, self._file_path[:-len(".part")])
+            self._file = None
+        if reopen:
+            self._file_index += 1
+            name = f"battle-{self._session}-{self._file_index:04d}.ndjson.part"
+            self._file_path = os.path.join(self._directory, name)
+            self._file = open(self._file_path, "w", encoding="utf-8")
@@ -0,0 +1,98 @@
+"""
+Stand-in for the analytics collector: ingests the closed telemetry files
+(telemetry/*.ndjson, see telemetry.py), folds them into running totals in
+telemetry/collected.json and moves them to telemetry/ingested/.
+
+    python -m gameEngine.telemetry_collector [directory] [--watch]
+"""
+import json
+import os
+import sys
+import time
+from .constants import TELEMETRY_DIR
+
+COLLECTED_FILE = "collected.json"
+INGESTED_DIR = "ingested"
+WATCH_INTERVAL = 2.0
+
+def empty_totals():
+    return {
+        "files": 0,
+        "events": {},              # event name -> count
+        "dropped": 0,
+        "damage_dealt": {},        # unit id -> total damage
+        "defeated": {},            # unit id -> times brought to 0 HP
+        "moves": {},               # unit id -> number of moves
+        "tiles_moved": {},         # unit id -> total Manhattan distance moved
+        "turns_ended": 0,
+        "frame_spikes": 0,
+        "worst_frame_ms": 0,
+    }
+
+def load_totals(directory):
+    path = os.path.join(directory, COLLECTED_FILE)
+    if not os.path.exists(path):
+        return empty_totals()
+    totals = empty_totals()     # older totals files may lack newer keys
+    with open(path, 'r', encoding='utf-8') as f:
+        totals.update(json.load(f))
+    return totals
+
+def save_totals(directory, totals):
+    path = os.path.join(directory, COLLECTED_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(totals, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def add_event(totals, event):
+    name = event.get("e")
+    if name == "dropped":
+        totals["dropped"] += event.get("count", 0)
+        return
+    totals["events"][name] = totals["events"].get(name, 0) + 1
+    if name == "move":
+        unit = event["unit"]
+        totals["moves"][unit] = totals["moves"].get(unit, 0) + 1
+        totals["tiles_moved"][unit] = totals["tiles_moved"].get(unit, 0) + event["steps"]
+    elif name == "attack":
+        attacker = event["attacker"]
+        totals["damage_dealt"][attacker] = totals["damage_dealt"].get(attacker, 0) + event["damage"]
+        if event["hp"] <= 0:
+            defender = event["defender"]
+            totals["defeated"][defender] = totals["defeated"].get(defender, 0) + 1
+    elif name == "turn_end":
+        totals["turns_ended"] += 1
+    elif name == "frame_spike":
+        totals["frame_spikes"] += 1
+        totals["worst_frame_ms"] = max(totals["worst_frame_ms"], event["ms"])
+
+def ingest(directory=TELEMETRY_DIR):
+    """Fold every closed telemetry file into the totals. Returns the number of files ingested."""
+    names = sorted(n for n in os.listdir(directory) if n.endswith(".ndjson"))
+    if not names:
+        return 0
+    totals = load_totals(directory)
+    done_dir = os.path.join(directory, INGESTED_DIR)
+    os.makedirs(done_dir, exist_ok=True)
+    for name in names:
+        path = os.path.join(directory, name)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    add_event(totals, json.loads(line))
+        totals["files"] += 1
+        os.replace(path, os.path.join(done_dir, name))
+    save_totals(directory, totals)
+    return len(names)
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--watch"]
+    directory = args[0] if args else TELEMETRY_DIR
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        count = ingest(directory)
+        if count:
+            print(f"Ingested {count} file(s) into {os.path.join(directory, COLLECTED_FILE)}")
+        if "--watch" not in sys.argv:
+            break
+        time.sleep(WATCH_INTERVAL)
@@ -0,0 +1,144 @@
+import math
+import numpy as np
+import pygame
+from .constants import FOG_COLOR
+
+SIDES = ("player", "enemy")
+
+class VisibilityEngine:
+    """
+    Fog-of-war bookkeeping for one grid battle.
+
+    Instead of recomputing every unit's vision each frame, we keep a count per
+    side per tile of how many units currently see it. A unit moving or dying
+    only touches the tiles inside its own vision disc, and the fog overlay
+    surface is patched in place for the tiles that flipped between seen/unseen.
+
+    The overlay holds one pixel per tile, so its size follows the tile count
+    rather than the map's pixel size. Only the tile window under the camera
+    is scaled up, and that copy is reused until a tile flips or the camera
+    crosses into another tile.
+    """
+    def __init__(self, width, height, tile_size, viewer_side="player"):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.viewer = SIDES.index(viewer_side)
+
+        # counts[side, y, x] = number of units of that side seeing (x, y)
+        self.counts = np.zeros((len(SIDES), height, width), dtype=np.int32)
+        self._units = {}    # id(unit) -> (side index, x, y, radius)
+        self._discs = {}    # radius -> boolean disc mask, built once per radius
+
+        # One alpha pixel per tile for the whole map, everything fogged at start
+        self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.overlay.fill(FOG_COLOR)
+        self.revision = 0         # bumped whenever a tile flips
+        self._scaled = None       # tile-size copy of the window under the camera
+        self._scaled_key = None   # (tile window, revision) it was built for
+
+    def add_unit(self, unit, radius):
+        side = SIDES.index(unit["side"])
+        self._units[id(unit)] = (side, unit["x"], unit["y"], radius)
+        self._update(side, [(unit["x"], unit["y"], radius, 1)])
+
+    def remove_unit(self, unit):
+        entry = self._units.pop(id(unit), None)
+        if entry is None:
+            return
+        side, x, y, radius = entry
+        self._update(side, [(x, y, radius, -1)])
+
+    def update_unit(self, unit):
+        """Re-read the unit's position; only does work if it actually moved."""
+        entry = self._units.get(id(unit))
+        if entry is None:
+            return
+        side, old_x, old_y, radius = entry
+        new_x, new_y = unit["x"], unit["y"]
+        if (old_x, old_y) == (new_x, new_y):
+            return
+        self._units[id(unit)] = (side, new_x, new_y, radius)
+        self._update(side, [(old_x, old_y, radius, -1), (new_x, new_y, radius, 1)])
+
+    def is_visible(self, x, y, side="player"):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self.counts[SIDES.index(side), y, x] > 0
+
+    def can_viewer_see(self, unit):
+        """True if the viewing side should be shown this unit."""
+        if SIDES.index(unit["side"]) == self.viewer:
+            return True
+        return self.is_visible(unit["x"], unit["y"], SIDES[self.viewer])
+
+    def _disc(self, radius):
+        disc = self._discs.get(radius)
+        if disc is None:
+            offsets = np.arange(-radius, radius + 1)
+            disc = (offsets[:, None] ** 2 + offsets[None, :] ** 2) <= radius * radius
+            self._discs[radius] = disc
+        return disc
+
+    def _clip(self, x, y, radius):
+        """Clip a disc centred on (x, y) to the map; returns map and disc slices."""
+        x0, x1 = max(0, x - radius), min(self.width, x + radius + 1)
+        y0, y1 = max(0, y - radius), min(self.height, y + radius + 1)
+        map_slice = (slice(y0, y1), slice(x0, x1))
+        disc_slice = (slice(y0 - (y - radius), y1 - (y - radius)),
+                      slice(x0 - (x - radius), x1 - (x - radius)))
+        return map_slice, disc_slice
+
+    def _update(self, side, changes):
+        """
+        Apply a batch of (x, y, radius, +1/-1) disc changes for one side.
+        For the viewing side, patch the overlay for tiles whose state flipped.
+        """
+        track = side == self.viewer
+        if track:
+            # Bounding box of every touched disc, so a move is diffed only once
+            x0 = max(0, min(x - r for x, y, r, _ in changes))
+            x1 = min(self.width, max(x + r + 1 for x, y, r, _ in changes))
+            y0 = max(0, min(y - r for x, y, r, _ in changes))
+            y1 = min(self.height, max(y + r + 1 for x, y, r, _ in changes))
+            if x0 >= x1 or y0 >= y1:
+                track = False
+            else:
+                before = self.counts[side, y0:y1, x0:x1] > 0
+
+        for x, y, radius, delta in changes:
+            map_slice, disc_slice = self._clip(x, y, radius)
+            disc = self._disc(radius)[disc_slice]
+            if delta > 0:
+                self.counts[side][map_slice] += disc
+            else:
+                self.counts[side][map_slice] -= disc
+
+        if track:
+            after = self.counts[side, y0:y1, x0:x1] > 0
+            for ty, tx in np.argwhere(before != after):
+                self._patch_tile(x0 + int(tx), y0 + int(ty), bool(after[ty, tx]))
+
+    def _patch_tile(self, x, y, visible):
+        self.overlay.set_at((x, y), (0, 0, 0, 0) if visible else FOG_COLOR)
+        self.revision += 1
+
+    def draw(self, screen, camera_x, camera_y, top, view_w, view_h):
+        """Blit the fog for the view (view_w x view_h at y=top) in one call."""
+        t = self.tile_size
+        tx0, ty0 = camera_x // t, camera_y // t
+        tx1 = min(self.width, math.ceil((camera_x + view_w) / t))
+        ty1 = min(self.height, math.ceil((camera_y + view_h) / t))
+        if tx0 >= tx1 or ty0 >= ty1:
+            return
+        key = (tx0, ty0, tx1, ty1, self.revision)
+        if key != self._scaled_key:
+            size = ((tx1 - tx0) * t, (ty1 - ty0) * t)
+            window = self.overlay.subsurface((tx0, ty0, tx1 - tx0, ty1 - ty0))
+            if self._scaled is not None and self._scaled.get_size() == size:
+                pygame.transform.scale(window, size, self._scaled)
+            else:
+                self._scaled = pygame.transform.scale(window, size)
+            self._scaled_key = key
+        area = pygame.Rect(camera_x - tx0 * t, camera_y - ty0 * t, view_w, view_h)
+        screen.blit(self._scaled, (0, top), area)
@@ -1,8 +1,14 @@
+import importlib
 import os
+import sys
 import pygame
 from gameEngine.chapter_manager import load_chapters_config
 from gameEngine.state_manager import load_game_state, save_game_state, GameState
-from gameEngine.game_manager import GameManager
+from gameEngine.startup import StartupTrace, BackgroundTask
+from gameEngine.telemetry import get_telemetry
+from gameEngine.battle_state import ActionState
+from gameEngine.hover import HoverTracker
+from gameEngine.camera import Camera, ViewportBuffer
 from gameEngine.constants import *
 
 # Possible "modes" of the game
@@ -18,30 +24,61 @@ def list_save_files(folder="savedStates"):
     files = [f for f in os.listdir(folder) if f.endswith(".json")]
     return files
 
+def parse_connect_arg(argv):
+    """(host, port) from '--connect HOST[:PORT]', or None for a local game."""
+    if "--connect" not in argv or argv.index("--connect") + 1 >= len(argv):
+        return None
+    host, _, port = argv[argv.index("--connect") + 1].partition(":")
+    return host, int(port) if port else NET_DEFAULT_PORT
+
 def main():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("War Chess in Python - In-Game Menu + Grid")
+    trace = StartupTrace("--trace-startup" in sys.argv or bool(os.environ.get("CCZ_TRACE_STARTUP")))
+
+    # Only the subsystems the menu needs; audio/joystick are never used
+    with trace.phase("display + font init"):
+        pygame.display.init()
+        pygame.font.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("War Chess in Python - In-Game Menu + Grid")
 
     # Store the default window size
     default_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
 
-    # We'll load the chapters config once (the chapters themselves don't change).
-    chapters_data = load_chapters_config("chapters")  # Now points to a directory
+    # Everything that grows with content loads in the background while the menu is up:
+    # the chapters config, the save list and the grid engine (numpy & co.)
+    chapters_task = BackgroundTask("chapters", lambda: load_chapters_config("chapters"), trace)
+    saves_task = BackgroundTask("save scan", lambda: list_save_files("savedStates"), trace)
+    engine_task = BackgroundTask("engine import", lambda: importlib.import_module("gameEngine.game_manager"), trace)
+    startup_tasks = [chapters_task, saves_task, engine_task]
+
+    # LAN play: connect to the relay right away, the battle syncs once both sides enter grid mode
+    net_client = None
+    net_session = None
+    connect = parse_connect_arg(sys.argv)
+    if connect:
+        from gameEngine.netplay import NetClient
+        net_client = NetClient(*connect)
+
+    # Battle analytics, written to telemetry/ by a background thread
+    telemetry = get_telemetry()
+    if "--telemetry" in sys.argv or os.environ.get("CCZ_TELEMETRY"):
+        telemetry.start(TELEMETRY_DIR)
 
     # We'll keep a reference to our GameManager, but create it only after user chooses a save.
     manager = None
 
     # UI state
-    font = pygame.font.SysFont(None, FONT_SIZE)
+    with trace.phase("menu font"):
+        font = pygame.font.SysFont(None, FONT_SIZE)
     clock = pygame.time.Clock()
+    hover = HoverTracker()
 
     # Start in MENU mode
     mode = MODE_MENU
 
-    # For the MENU mode
-    menu_saves = list_save_files("savedStates")
-    menu_options = menu_saves + ["New Game"]
+    # For the MENU mode: "New Game" is usable right away, saves show up once scanned
+    menu_saves = None
+    menu_options = ["New Game"]
     selected_index = 0
 
     # For the SAVE mode, we store typed text in typed_save_name
@@ -50,13 +87,24 @@ def main():
     # We'll keep a temporary GameState reference so that once we pick a save/new game, we create manager
     game_state_obj = None
     
-    # Camera position
+    # Camera position (integer pixels, taken from the smooth camera each frame)
+    camera = Camera()
+    viewport = ViewportBuffer()
     camera_x = 0
     camera_y = 0
+    show_minimap = True
+    box_start = None    # shift + drag box selection anchor, in the same space as grid clicks
 
+    first_frame = True
     running = True
     while running:
-        clock.tick(300)
+        dt = clock.tick(300) / 1000.0
+        if clock.get_rawtime() > TELEMETRY_SPIKE_MS:
+            telemetry.record_frame_spike(clock.get_rawtime())
+        if menu_saves is None and saves_task.done():
+            menu_saves = saves_task.result()
+            menu_options = menu_saves + ["New Game"]
+            selected_index += len(menu_saves)   # keep the same option highlighted
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -84,8 +132,11 @@ def main():
                                 game_state_obj = GameState(loaded_dict)
 
                         # Now we have a valid GameState, let's create our GameManager
-                        manager = GameManager(chapters_data, game_state_obj)
-                        manager.start_chapter()
+                        # (waits for the background loads if they haven't finished yet)
+                        with trace.phase("first chapter"):
+                            GameManager = engine_task.result().GameManager
+                            manager = GameManager(chapters_task.result(), game_state_obj)
+                            manager.start_chapter()
                         mode = MODE_PLAY
 
             # --- PLAY Mode: normal gameplay (overworld) ---
@@ -103,6 +154,17 @@ def main():
                         grid_width = min(640, manager.current_grid_data.get("width")*TILE_SIZE)
                         grid_height = min(480, manager.current_grid_data.get("height")*TILE_SIZE + STATUS_BAR_HEIGHT)
                         screen = pygame.display.set_mode((grid_width, grid_height))
+                        camera.reset(manager.current_grid_data.get("width") * TILE_SIZE,
+                                     manager.current_grid_data.get("height") * TILE_SIZE,
+                                     grid_width, grid_height - STATUS_BAR_HEIGHT)
+                        camera_x, camera_y = camera.ix, camera.iy
+                        viewport.invalidate()
+                        hover.reset()
+                        if net_client:
+                            if net_session is None or net_session.manager is not manager:
+                                from gameEngine.netplay import NetSession
+                                net_session = NetSession(manager, net_client)
+                            net_session.on_grid_entered()
                         mode = MODE_GRID
 
             # --- SAVE Mode: type a filename for your save ---
@@ -127,29 +189,38 @@ def main():
             elif mode == MODE_GRID and manager is not None:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
-                        # Return to PLAY mode and restore default window size
+                        # Return to PLAY mode and restore default window size;
+                        # the battle is kept and resumes on the next 'g'
+                        manager.suspend_battle()
                         screen = pygame.display.set_mode(default_size)
                         mode = MODE_PLAY
-                    # Add camera movement controls
-                    elif event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
-                        grid_width = manager.current_grid_data.get("width") * TILE_SIZE
-                        grid_height = manager.current_grid_data.get("height") * TILE_SIZE
-                        screen_width, screen_height = screen.get_size()
-                        
-                        if event.key == pygame.K_LEFT:
-                            camera_x = max(0, camera_x - TILE_SIZE)
-                        elif event.key == pygame.K_RIGHT:
-                            camera_x = min(grid_width - screen_width, camera_x + TILE_SIZE)
-                        elif event.key == pygame.K_UP:
-                            camera_y = max(0, camera_y - TILE_SIZE)
-                        elif event.key == pygame.K_DOWN:
-                            camera_y = min(grid_height - screen_height, camera_y + TILE_SIZE)
+                    elif event.key == pygame.K_s:
+                        # Save mid-battle: suspend it and go type a filename
+                        manager.suspend_battle()
+                        screen = pygame.display.set_mode(default_size)
+                        typed_save_name = ""
+                        mode = MODE_SAVE
+                    elif event.key == pygame.K_m:
+                        show_minimap = not show_minimap
                 elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 2:
+                        # middle button drags the map
+                        camera.start_drag(event.pos)
                     if event.button == 1:
                         mouse_x, mouse_y = event.pos
+                        # Clicking the minimap recenters the camera there (unless the popup
+                        # menu is open: it gets clamped into the same corner and wins)
+                        if (show_minimap and manager.minimap and not manager.context_menu["visible"]
+                                and manager.minimap.contains(event.pos)):
+                            camera.center_on(*manager.minimap.to_world(event.pos, TILE_SIZE))
+                            continue
                         # Check if click is in the status bar
                         if mouse_y <= STATUS_BAR_HEIGHT:
                             handle_status_bar_click(mouse_x, mouse_y, manager)
+                        elif pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                            # Shift + drag starts a box selection for a group order
+                            box_start = (mouse_x + camera_x, mouse_y + camera_y)
+                            continue
                         else:
                             # Check if we clicked the popup menu
                             if manager.context_menu["visible"]:
@@ -160,66 +231,90 @@ def main():
                             # Otherwise it's a grid click
                             manager.handle_grid_click((mouse_x + camera_x, mouse_y + camera_y))
                         # check game victory or defeat condition
-                        if manager.check_chapter_completion():
-                            manager.on_chapter_victory()
+                        if battle_finished(manager):
+                            screen = pygame.display.set_mode(default_size)
                             mode = MODE_PLAY  # Return to play mode
                             continue
                     if event.button == 3:
                         # right click cancels menu and resets selected unit
                         if manager:
-                            if manager.selected_unit:
-                                manager.selected_unit.clear()
-                                manager.selected_unit.update(manager.selected_unit_before_action)
-                                manager.selected_unit_before_action = None
-                                manager.selected_unit = None
-                            manager.attackable_tiles = []
-                            manager.attackable_tiles_drawing = []
-                            manager.reachable_tiles = []
-                            manager.context_menu["visible"] = False
-                            manager.message = "Pop-up menu or attack status cancelled by right-click."
+                            manager.cancel_selection()
                         continue
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    if event.button == 2:
+                        camera.end_drag()
+                    elif event.button == 1 and box_start is not None:
+                        end = (event.pos[0] + camera_x, max(event.pos[1], STATUS_BAR_HEIGHT) + camera_y)
+                        manager.select_group(box_start[0] // TILE_SIZE,
+                                             (box_start[1] - STATUS_BAR_HEIGHT) // TILE_SIZE,
+                                             end[0] // TILE_SIZE,
+                                             (end[1] - STATUS_BAR_HEIGHT) // TILE_SIZE)
+                        box_start = None
                 elif event.type == pygame.MOUSEMOTION:
-                    # Handle mouse hover
-                    mouse_x, mouse_y = event.pos
-                    if mouse_y > STATUS_BAR_HEIGHT:
-                        # Convert pixel coordinates to grid coordinates
-                        grid_x = (mouse_x + camera_x) // TILE_SIZE
-                        grid_y = (mouse_y + camera_y - STATUS_BAR_HEIGHT) // TILE_SIZE
-                        # Get unit at hovered position
-                        hovered_unit = manager.get_unit_at(grid_x, grid_y)
-                        if hovered_unit:
-                            # Show unit info in message
-                            manager.message = (
-                                f"Unit: {hovered_unit['unitId']} | "
-                                f"HP: {hovered_unit['HP']} | "
-                                f"Attack: {hovered_unit['attack']} | "
-                                f"Defense: {hovered_unit['defense']} | "
-                                f"MP: {hovered_unit['MP']}"
-                            )
-                        else:
-                            manager.message = ""
+                    if camera.dragging:
+                        camera.drag_to(event.pos)
+                    # Only remember the latest position; the tooltip is resolved once per frame
+                    hover.on_motion(event.pos)
+
+        # Commands from the other player (never blocks; the socket lives on its own thread)
+        if mode == MODE_GRID and net_session is not None:
+            if net_session.poll() and battle_finished(manager):
+                screen = pygame.display.set_mode(default_size)
+                mode = MODE_PLAY
+
+        if mode == MODE_GRID and manager is not None:
+            mouse_pos = pygame.mouse.get_pos() if pygame.mouse.get_focused() else None
+            camera.update(dt, pygame.key.get_pressed(), mouse_pos, STATUS_BAR_HEIGHT)
+            camera_x, camera_y = camera.ix, camera.iy
+            hover.update(manager, camera_x, camera_y)
 
         # --- RENDER / DRAW ---
         screen.fill(BLACK)
 
         if mode == MODE_MENU:
-            draw_menu(screen, font, menu_options, selected_index)
+            draw_menu(screen, font, menu_options, selected_index, menu_saves is None)
         elif mode == MODE_PLAY:
             if manager:
                 manager.draw_status(screen)
         elif mode == MODE_SAVE:
             draw_save_prompt(screen, font, typed_save_name)
         elif mode == MODE_GRID:
-            draw_grid_mode(screen, manager, font, camera_x, camera_y)
+            draw_grid_mode(screen, manager, font, viewport, camera_x, camera_y)
+            if box_start is not None:
+                draw_box_selection(screen, box_start, pygame.mouse.get_pos(), camera_x, camera_y)
+            if show_minimap and manager.minimap:
+                draw_minimap(screen, manager.minimap, camera_x, camera_y)
             draw_popup_menu(screen, manager, font)
+            # The popup opens on the hovered unit; a tooltip there would hide its options
+            if not manager.context_menu["visible"]:
+                hover.draw(screen)
 
         # 2) Draw the status bar (always on top)
         draw_status_bar(screen, font, manager, mode)
         pygame.display.flip()
 
+        if first_frame:
+            trace.mark("first frame")
+            first_frame = False
+        if trace.enabled and all(task.done() for task in startup_tasks):
+            trace.report()
+
+    if net_client:
+        net_client.close()
+    telemetry.close()
     pygame.quit()
 
-def draw_menu(screen, font, options, selected_index):
+def battle_finished(manager):
+    """Check victory, then defeat; wraps up the chapter and returns True if the battle ended."""
+    if manager.check_chapter_completion():
+        manager.on_chapter_victory()
+        return True
+    if manager.check_chapter_defeat():
+        manager.on_chapter_defeat()
+        return True
+    return False
+
+def draw_menu(screen, font, options, selected_index, loading_saves=False):
     """Draw a simple vertical menu (saves + 'New Game')."""
     title_surf = font.render("Select a Save or Start New Game", True, WHITE)
     screen.blit(title_surf, (MENU_TITLE_X, MENU_START_Y))
@@ -231,6 +326,10 @@ def draw_menu(screen, font, options, selected_index):
         screen.blit(text_surf, (MENU_OPTION_X, y_offset))
         y_offset += MENU_OPTION_SPACING
 
+    if loading_saves:
+        loading_surf = font.render("Loading saves...", True, MEDIUM_GRAY)
+        screen.blit(loading_surf, (MENU_OPTION_X, y_offset))
+
 def draw_save_prompt(screen, font, typed_name):
     """Draw the UI for typing a save filename."""
     instructions = [
@@ -247,7 +346,7 @@ def draw_save_prompt(screen, font, typed_name):
     typed_surf = font.render("Filename: " + typed_name, True, YELLOW)
     screen.blit(typed_surf, (50, y_offset))
 
-def draw_grid_mode(screen, manager, font, camera_x, camera_y):
+def draw_grid_mode(screen, manager, font, viewport, camera_x, camera_y):
     """
     Renders the grid campaign with scrolling support.
     """
@@ -257,38 +356,22 @@ def draw_grid_mode(screen, manager, font, camera_x, camera_y):
         screen.blit(text_surf, (50, 50))
         return
 
-    # Draw background
-    if manager.grid_background:
-        # Scale background to full grid size
-        grid_width = grid_data.get("width", 0) * TILE_SIZE
-        grid_height = grid_data.get("height", 0) * TILE_SIZE
-        scaled_bg = pygame.transform.scale(manager.grid_background, (grid_width, grid_height))
-        
-        # Create a subsurface of the visible portion
-        screen_width, screen_height = screen.get_size()
-        visible_rect = pygame.Rect(camera_x, camera_y, screen_width, screen_height - STATUS_BAR_HEIGHT)
-        try:
-            visible_bg = scaled_bg.subsurface(visible_rect)
-            screen.blit(visible_bg, (0, STATUS_BAR_HEIGHT))
-        except ValueError:
-            # Handle case where camera might be partially out of bounds
-            screen.fill((34, 139, 34))  # Fallback to green background
-    else:
-        screen.fill((34, 139, 34))
+    # Draw background: the viewport buffer only redraws what scrolled into view
+    screen_width, screen_height = screen.get_size()
+    background = viewport.render(manager.grid_background, camera_x, camera_y,
+                                 screen_width, screen_height - STATUS_BAR_HEIGHT)
+    screen.blit(background, (0, STATUS_BAR_HEIGHT))
 
-    # Draw each unit (adjusted for camera position)
-    for unit in manager.grid_units:
-        x_px = (unit["x"] * TILE_SIZE) - camera_x
-        y_px = (unit["y"] * TILE_SIZE) + STATUS_BAR_HEIGHT - camera_y
-        
-        # Only draw if unit is visible in viewport
-        screen_width, screen_height = screen.get_size()
-        if (0 <= x_px < screen_width and STATUS_BAR_HEIGHT <= y_px < screen_height):
-            if unit["side"] == "player":
-                color = (0, 255, 0) if unit["hasMoved"] == manager.ACTION_STATE_NOT_YET else (1, 150, 32)
-            else:
-                color = (255, 0, 0) if unit["hasMoved"] == manager.ACTION_STATE_NOT_YET else (139, 0, 0)
-            pygame.draw.rect(screen, color, (x_px, y_px, TILE_SIZE, TILE_SIZE))
+    # Draw every unit in the viewport in one batched blit (adjusted for camera position)
+    visibility = manager.visibility
+    manager.unit_animator.draw(screen, manager.grid_units, camera_x, camera_y, STATUS_BAR_HEIGHT,
+                               ActionState.NOT_YET,
+                               visibility.can_viewer_see if visibility else None)
+
+    # Fog of war: the visibility engine blits the part under the camera in one call
+    if visibility:
+        visibility.draw(screen, camera_x, camera_y, STATUS_BAR_HEIGHT,
+                        screen_width, screen_height - STATUS_BAR_HEIGHT)
 
     # Draw reachable and attackable tiles (adjusted for camera)
     highlight_surf = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
@@ -307,14 +390,34 @@ def draw_grid_mode(screen, manager, font, camera_x, camera_y):
         if (0 <= x_px < screen_width and STATUS_BAR_HEIGHT <= y_px < screen_height):
             screen.blit(attack_highlight_surf, (x_px, y_px))
 
+    # Outline box-selected units waiting for a group order
+    for unit in manager.group:
+        x_px = (unit["x"] * TILE_SIZE) - camera_x
+        y_px = (unit["y"] * TILE_SIZE) + STATUS_BAR_HEIGHT - camera_y
+        if (0 <= x_px < screen_width and STATUS_BAR_HEIGHT <= y_px < screen_height):
+            pygame.draw.rect(screen, GROUP_HIGHLIGHT_COLOR, (x_px, y_px, TILE_SIZE, TILE_SIZE), 2)
+
     # Overlay some textual info: e.g. "Press ESC to exit"
     msg = f"Chapter {manager.game_state.currentChapterId} Grid - Max Turns {grid_data.get('maxTurns', 0)}"
     text_surf = font.render(msg, True, WHITE)
     screen.blit(text_surf, (10, 10))
 
-    help_surf = font.render("Press ESC to exit grid mode", True, WHITE)
+    help_surf = font.render("ESC = leave grid, S = save, Shift+drag = group", True, WHITE)
     screen.blit(help_surf, (10, 40))
 
+def draw_box_selection(screen, box_start, mouse_pos, camera_x, camera_y):
+    """Rubber band from the drag anchor to the mouse while shift-dragging."""
+    x0, y0 = box_start[0] - camera_x, box_start[1] - camera_y
+    x1, y1 = mouse_pos[0], max(mouse_pos[1], STATUS_BAR_HEIGHT)
+    rect = pygame.Rect(min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+    pygame.draw.rect(screen, BOX_SELECT_COLOR, rect, 1)
+
+def draw_minimap(screen, minimap, camera_x, camera_y):
+    """Minimap in the bottom-right corner with the camera's view outlined."""
+    screen_w, screen_h = screen.get_size()
+    minimap.place(screen_w, screen_h)
+    minimap.draw(screen, camera_x, camera_y, screen_w, screen_h - STATUS_BAR_HEIGHT, TILE_SIZE)
+
 
 def draw_status_bar(screen, font, manager, mode):
     """
@@ -0,0 +1,148 @@
+"""
+LAN play over localhost: the stand-in relay plus two NetClient/NetSession
+pairs driving headless GameManagers.
+"""
+import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+from gameEngine.battle_snapshot import delta_checksum
+from gameEngine.battle_state import TurnPhase
+from gameEngine.chapter_manager import load_chapters_config
+from gameEngine.constants import STATUS_BAR_HEIGHT, TILE_SIZE
+from gameEngine.game_manager import GameManager
+from gameEngine.net_relay import serve
+from gameEngine.netplay import NetClient, NetSession
+from gameEngine.state_manager import GameState
+
+@pytest.fixture
+def relay_port():
+    """Run net_relay.serve on a free localhost port in a background thread."""
+    ports = queue.SimpleQueue()
+    running = {}
+
+    def on_listening(port):
+        running["loop"] = asyncio.get_running_loop()
+        running["task"] = asyncio.current_task()
+        ports.put(port)
+
+    def run():
+        try:
+            asyncio.run(serve("127.0.0.1", 0, on_listening))
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    yield ports.get(timeout=5)
+    running["loop"].call_soon_threadsafe(running["task"].cancel)
+    thread.join(timeout=5)
+
+@pytest.fixture
+def make_manager(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((640, 480))
+    chapters = load_chapters_config("chapters")
+
+    def make(chapter_id=1):
+        game_state = GameState()
+        game_state.currentChapterId = chapter_id
+        manager = GameManager(chapters, game_state)
+        manager.start_grid_mode()
+        return manager
+    yield make
+    pygame.quit()
+
+def click(manager, x, y):
+    manager.handle_grid_click((x * TILE_SIZE + 5, y * TILE_SIZE + 5 + STATUS_BAR_HEIGHT))
+
+def pump_until(sessions, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for session in sessions:
+            session.poll()
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError("timed out waiting for the sessions")
+
+def checksum(manager):
+    return delta_checksum(manager.capture_battle())
+
+def connect_pair(relay_port, host_mgr, guest_mgr):
+    host = NetSession(host_mgr, NetClient("127.0.0.1", relay_port))
+    pump_until([host], lambda: host.side is not None)
+    guest = NetSession(guest_mgr, NetClient("127.0.0.1", relay_port))
+    host.on_grid_entered()
+    guest.on_grid_entered()
+    pump_until([host, guest], lambda: guest.side is not None and host.peer_joined)
+    return host, guest
+
+def test_lockstep_commands_and_snapshot_repair(relay_port, make_manager):
+    host_mgr, guest_mgr = make_manager(), make_manager()
+    host, guest = connect_pair(relay_port, host_mgr, guest_mgr)
+    assert (host.side, guest.side) == ("player", "enemy")
+
+    # The guest may not command the host's units
+    click(guest_mgr, 2, 2)
+    assert guest_mgr.selected_unit is None
+
+    # Host: two moves and an end turn, replayed on the guest
+    click(host_mgr, 2, 2)
+    click(host_mgr, 5, 3)
+    host_mgr.handle_stay_action()
+    click(host_mgr, 3, 2)
+    click(host_mgr, 6, 3)
+    host_mgr.handle_stay_action()
+    host_mgr.end_turn()
+    pump_until([host, guest], lambda: guest.seq == 3)
+    assert guest_mgr.battle.phase == TurnPhase.ENEMY
+    assert checksum(host_mgr) == checksum(guest_mgr)
+
+    # Corrupt the guest, then let it act: the host's checksum check catches
+    # the drift and its snapshot repairs the guest
+    next(u for u in guest_mgr.grid_units if u["unitId"] == "hero1")["HP"] = 99
+    click(guest_mgr, 8, 4)
+    click(guest_mgr, 7, 3)
+    guest_mgr.start_attack_mode()
+    click(guest_mgr, 6, 3)
+    guest_mgr.end_turn()
+    pump_until([host, guest], lambda: host.seq == 5 and guest.seq == 5
+               and checksum(host_mgr) == checksum(guest_mgr))
+    hero1 = next(u for u in guest_mgr.grid_units if u["unitId"] == "hero1")
+    assert hero1["HP"] == 20
+    assert host_mgr.battle.phase == guest_mgr.battle.phase == TurnPhase.PLAYER
+    assert host_mgr.battle.turn == guest_mgr.battle.turn == 2
+
+    host.client.close()
+    guest.client.close()
+
+def test_fog_of_war_follows_the_local_side(relay_port, make_manager):
+    # Chapter 2 has fog of war; hero1 (1,1) and enemy1 (10,8) start out of each other's sight
+    host_mgr, guest_mgr = make_manager(2), make_manager(2)
+    host, guest = connect_pair(relay_port, host_mgr, guest_mgr)
+    pump_until([host, guest], lambda: guest_mgr.message == "Battle synced with the host.")
+
+    def unit(manager, unit_id):
+        return next(u for u in manager.grid_units if u["unitId"] == unit_id)
+
+    assert host_mgr.visibility.can_viewer_see(unit(host_mgr, "hero1"))
+    assert not host_mgr.visibility.can_viewer_see(unit(host_mgr, "enemy1"))
+    assert guest_mgr.visibility.can_viewer_see(unit(guest_mgr, "enemy1"))
+    assert not guest_mgr.visibility.can_viewer_see(unit(guest_mgr, "hero1"))
+    assert host_mgr.minimap.hidden_side == "enemy"
+    assert guest_mgr.minimap.hidden_side == "player"
+
+    host.client.close()
+    guest.client.close()